@@ -0,0 +1,408 @@
+"""
+채팅 서버 부하 테스트 / 지연 시간 벤치마크
+
+실제 FastAPI 앱(main.app)을 프로세스 안에서 ASGI 로 직접 구동하고,
+여러 채팅방에 가상 WebSocket 클라이언트를 접속시켜 메시지를 보낸다.
+
+- 혐오 표현 감지 API 대신 지연 시간을 설정할 수 있는 stub 감지 백엔드 사용
+- DB 는 임시 SQLite 파일, Redis 는 fakeredis 사용 (컨테이너 불필요)
+- 전달 지연 시간 백분위, 팬아웃 처리량, 이벤트 루프 지연,
+  메시지당 DB/Redis 호출 수를 JSON 으로 저장하여 실행 간 비교
+
+추가 패키지: fakeredis[lua], aiosqlite (없으면 동기 DB 세션 사용)
+
+실행 (web 디렉토리에서):
+    python -m benchmarks.chat_load --clients 1000 --rooms 50 --rate 1 --duration 20 \\
+        --classifier-latency-ms 20 --output bench_results/run.json
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import time
+from typing import Dict, List, Optional
+from urllib.parse import urlencode
+
+MESSAGE_PREFIX = "bench"
+
+
+def percentiles(values: List[float]) -> Dict[str, float]:
+    if not values:
+        return {"count": 0}
+    ordered = sorted(values)
+
+    def pick(q: float) -> float:
+        return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+    return {
+        "count": len(ordered),
+        "mean": sum(ordered) / len(ordered),
+        "p50": pick(0.50),
+        "p90": pick(0.90),
+        "p99": pick(0.99),
+        "p999": pick(0.999),
+        "max": ordered[-1],
+    }
+
+
+class CallCounter:
+    """DB 문장 / Redis 왕복 및 명령 수"""
+
+    def __init__(self):
+        self.db_statements = 0
+        self.redis_round_trips = 0
+        self.redis_commands = 0
+
+    def snapshot(self) -> Dict[str, int]:
+        return dict(vars(self))
+
+
+class ASGIWebSocketClient:
+    """네트워크 없이 ASGI 앱에 직접 연결하는 WebSocket 클라이언트"""
+
+    def __init__(self, app, path: str, query: Dict[str, str], client_id: int):
+        self.app = app
+        self.scope = {
+            "type": "websocket",
+            "asgi": {"version": "3.0"},
+            "http_version": "1.1",
+            "scheme": "ws",
+            "path": path,
+            "raw_path": path.encode(),
+            "root_path": "",
+            "query_string": urlencode(query).encode(),
+            "headers": [],
+            "client": ("127.0.0.1", 10000 + client_id),
+            "server": ("bench", 80),
+            "subprotocols": [],
+        }
+        self._to_app: asyncio.Queue = asyncio.Queue()
+        self._from_app: asyncio.Queue = asyncio.Queue()
+        self._task: Optional[asyncio.Task] = None
+        self.closed = False
+
+    async def connect(self) -> bool:
+        self._task = asyncio.create_task(self.app(self.scope, self._to_app.get, self._from_app.put))
+        await self._to_app.put({"type": "websocket.connect"})
+        message = await self._from_app.get()
+        return message["type"] == "websocket.accept"
+
+    async def send_json(self, data: dict):
+        await self._to_app.put({"type": "websocket.receive", "text": json.dumps(data, ensure_ascii=False)})
+
+    async def receive(self) -> Optional[dict]:
+        """수신 메시지 (연결이 닫히면 None)"""
+        message = await self._from_app.get()
+        if message["type"] == "websocket.close":
+            self.closed = True
+            return None
+        text = message.get("text")
+        if text is None:
+            text = message["bytes"].decode("utf-8")
+        return json.loads(text)
+
+    async def close(self):
+        if self._task is None:
+            return
+        await self._to_app.put({"type": "websocket.disconnect", "code": 1000})
+        try:
+            await asyncio.wait_for(self._task, timeout=5)
+        except (asyncio.TimeoutError, Exception):
+            self._task.cancel()
+        # 수신 대기 중인 receive 종료
+        await self._from_app.put({"type": "websocket.close"})
+
+
+def configure_environment(workdir: str, args):
+    """앱 모듈 import 전에 벤치마크용 설정 적용"""
+    db_path = os.path.join(workdir, "bench.db")
+    os.environ["DATABASE_URL"] = f"sqlite:///{db_path}"
+    os.environ.setdefault("SECRET_KEY", "benchmark-secret")
+    os.environ.setdefault("ALGORITHM", "HS256")
+    os.environ["MESSAGE_SPILL_PATH"] = os.path.join(workdir, "message_spill.jsonl")
+    os.environ["BROADCAST_BACKEND"] = "memory"
+    os.environ["MODERATION_DEFAULT_MODE"] = args.moderation_mode
+    os.environ["PREFILTER_ENABLED"] = "true" if args.prefilter else "false"
+
+
+def install_fakes(counter: CallCounter, classifier_latency_ms: float):
+    """fakeredis / stub 감지 백엔드 연결 및 호출 수 계측"""
+    import fakeredis
+    import redis.asyncio.client as redis_client
+
+    from cached import redis_manager as redis_module
+    from router.chat_service import classify_text
+
+    server = fakeredis.FakeServer()
+
+    def create_client(self):
+        self._client = fakeredis.FakeAsyncRedis(server=server, decode_responses=True)
+        self.pool = self._client.connection_pool
+        self._scripts = {}
+
+    redis_module.RedisManager._create_client = create_client
+
+    execute_command = redis_client.Redis.execute_command
+    pipeline_execute = redis_client.Pipeline.execute
+
+    async def counted_execute_command(self, *args, **options):
+        counter.redis_round_trips += 1
+        counter.redis_commands += 1
+        return await execute_command(self, *args, **options)
+
+    async def counted_pipeline_execute(self, *args, **kwargs):
+        counter.redis_round_trips += 1
+        counter.redis_commands += len(self.command_stack)
+        return await pipeline_execute(self, *args, **kwargs)
+
+    redis_client.Redis.execute_command = counted_execute_command
+    redis_client.Pipeline.execute = counted_pipeline_execute
+
+    class StubClassifier(classify_text.ClassifierBackend):
+        """고정 지연 후 모두 일반 메시지로 판정"""
+
+        def __init__(self):
+            self.calls = 0
+            self.texts = 0
+
+        async def classify(self, texts):
+            self.calls += 1
+            self.texts += len(texts)
+            await asyncio.sleep(classifier_latency_ms / 1000)
+            return [{"label": "일반", "score": 0.99} for _ in texts]
+
+    stub = StubClassifier()
+    classify_text.classifier_backend = stub
+    return stub
+
+
+def seed(clients: int, rooms: int):
+    """사용자 / 채팅방 / 멤버 생성 후 사용자별 (토큰, 채팅방) 반환"""
+    from sqlalchemy import insert
+
+    from config.database import Base, SessionLocal, engine
+    from config.models import ChatRoom, Member, chat_room_members
+    from security.jwt import create_access_token
+
+    Base.metadata.drop_all(engine)
+    Base.metadata.create_all(engine)
+
+    db = SessionLocal()
+    try:
+        db.execute(insert(Member), [
+            {"id": i, "username": f"user{i}", "email": f"user{i}@bench.local", "hashed_password": "-"}
+            for i in range(1, clients + 1)
+        ])
+        db.execute(insert(ChatRoom), [
+            {"id": room_id, "name": f"room{room_id}", "created_by": 1}
+            for room_id in range(1, rooms + 1)
+        ])
+        assignments = [(user_id, (user_id - 1) % rooms + 1) for user_id in range(1, clients + 1)]
+        db.execute(insert(chat_room_members), [
+            {"chat_room_id": room_id, "member_id": user_id} for user_id, room_id in assignments
+        ])
+        db.commit()
+    finally:
+        db.close()
+
+    return [
+        (user_id, create_access_token({"sub": f"user{user_id}"}), room_id)
+        for user_id, room_id in assignments
+    ]
+
+
+async def monitor_loop_lag(interval: float, samples: List[float], stop: asyncio.Event):
+    """이벤트 루프 지연 (예정보다 늦게 깨어난 시간) 측정"""
+    loop = asyncio.get_running_loop()
+    while not stop.is_set():
+        expected = loop.time() + interval
+        await asyncio.sleep(interval)
+        samples.append(max(0.0, loop.time() - expected) * 1000)
+
+
+async def run(args) -> dict:
+    from sqlalchemy import event
+
+    import main
+    from config.database import async_engine, engine
+    from router.chat_service import chat
+
+    counter = CallCounter()
+    stub = install_fakes(counter, args.classifier_latency_ms)
+    main.classifier_backend = stub
+
+    def count_statement(*_):
+        counter.db_statements += 1
+
+    event.listen(engine, "before_cursor_execute", count_statement)
+    if async_engine is not None:
+        event.listen(async_engine.sync_engine, "before_cursor_execute", count_statement)
+
+    users = seed(args.clients, args.rooms)
+    room_sizes: Dict[int, int] = {}
+    for _, _, room_id in users:
+        room_sizes[room_id] = room_sizes.get(room_id, 0) + 1
+
+    rng = random.Random(args.seed)
+    latencies: List[float] = []
+    loop_lag: List[float] = []
+    sent: Dict[int, int] = {}
+    delivered = 0
+    stop_sending = asyncio.Event()
+    stop_monitor = asyncio.Event()
+
+    async with main.app.router.lifespan_context(main.app):
+        clients: List[ASGIWebSocketClient] = []
+        for start in range(0, len(users), args.connect_batch):
+            batch = [
+                ASGIWebSocketClient(main.app, f"/chat/ws/{room_id}", {"token": token}, user_id)
+                for user_id, token, room_id in users[start:start + args.connect_batch]
+            ]
+            results = await asyncio.gather(*(client.connect() for client in batch))
+            if not all(results):
+                raise RuntimeError("WebSocket connection was rejected")
+            clients.extend(batch)
+
+        # accept 이후 멤버 확인을 마치고 매니저에 등록될 때까지 대기
+        while len(chat.manager._connections) < len(clients):
+            await asyncio.sleep(0.01)
+
+        async def receiver(client: ASGIWebSocketClient):
+            nonlocal delivered
+            while True:
+                message = await client.receive()
+                if message is None:
+                    return
+                content = message.get("content", "")
+                if not content.startswith(MESSAGE_PREFIX):
+                    continue
+                sent_at = int(content.rsplit(" ", 1)[1])
+                latencies.append((time.perf_counter_ns() - sent_at) / 1e6)
+                delivered += 1
+
+        async def sender(index: int, client: ASGIWebSocketClient, room_id: int):
+            interval = 1 / args.rate
+            await asyncio.sleep(rng.random() * interval)  # 전송 시점 분산
+            seq = 0
+            while not stop_sending.is_set():
+                seq += 1
+                await client.send_json({"message": f"{MESSAGE_PREFIX} {index} {seq} {time.perf_counter_ns()}"})
+                sent[room_id] = sent.get(room_id, 0) + 1
+                await asyncio.sleep(interval)
+
+        counter_before = counter.snapshot()
+        monitor = asyncio.create_task(monitor_loop_lag(args.lag_interval_ms / 1000, loop_lag, stop_monitor))
+        receivers = [asyncio.create_task(receiver(client)) for client in clients]
+        started = time.perf_counter()
+        senders = [
+            asyncio.create_task(sender(i, client, room_id))
+            for i, (client, (_, _, room_id)) in enumerate(zip(clients, users))
+            if i % args.sender_every == 0
+        ]
+
+        await asyncio.sleep(args.duration)
+        stop_sending.set()
+        await asyncio.gather(*senders)
+        send_elapsed = time.perf_counter() - started
+
+        # 남은 메시지 전달 대기
+        expected = sum(count * room_sizes[room_id] for room_id, count in sent.items())
+        deadline = time.perf_counter() + args.drain_timeout
+        while delivered < expected and time.perf_counter() < deadline:
+            await asyncio.sleep(0.05)
+        elapsed = time.perf_counter() - started
+
+        stop_monitor.set()
+        await monitor
+        counter_after = counter.snapshot()
+        send_dropped = sum(connection.dropped for connection in chat.manager._connections.values())
+
+        for client in clients:
+            await client.close()
+        await asyncio.gather(*receivers, return_exceptions=True)
+
+        app_metrics = {
+            "batcher": chat.classify_batcher.metrics.snapshot(),
+            "prefilter": chat.prefilter.stats(),
+            "verdict_cache": chat.verdict_cache.stats(),
+            "room_members": chat.room_members.stats(),
+            "send_dropped": send_dropped,
+            "classifier_calls": stub.calls,
+            "classifier_texts": stub.texts,
+        }
+
+    messages = sum(sent.values())
+    calls = {key: counter_after[key] - counter_before[key] for key in counter_after}
+    return {
+        "config": vars(args),
+        "revision": git_revision(),
+        "python": sys.version.split()[0],
+        "messages_sent": messages,
+        "deliveries_expected": expected,
+        "deliveries": delivered,
+        "duration_s": elapsed,
+        "throughput": {
+            "messages_per_s": messages / send_elapsed if send_elapsed else 0.0,
+            "deliveries_per_s": delivered / elapsed if elapsed else 0.0,
+        },
+        "delivery_latency_ms": percentiles(latencies),
+        "event_loop_lag_ms": percentiles(loop_lag),
+        "calls": calls,
+        "calls_per_message": {key: value / messages if messages else 0.0 for key, value in calls.items()},
+        "app_metrics": app_metrics,
+    }
+
+
+def git_revision() -> Optional[str]:
+    try:
+        return subprocess.check_output(
+            ["git", "rev-parse", "--short", "HEAD"], stderr=subprocess.DEVNULL, text=True
+        ).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Chat server load benchmark")
+    parser.add_argument("--clients", type=int, default=1000, help="가상 WebSocket 클라이언트 수")
+    parser.add_argument("--rooms", type=int, default=50, help="채팅방 수 (클라이언트를 균등 배정)")
+    parser.add_argument("--rate", type=float, default=1.0, help="보내는 클라이언트당 초당 메시지 수")
+    parser.add_argument("--sender-every", type=int, default=1, help="N 번째 클라이언트마다 메시지 전송 (나머지는 수신만)")
+    parser.add_argument("--duration", type=float, default=10.0, help="메시지 전송 시간 (초)")
+    parser.add_argument("--drain-timeout", type=float, default=10.0, help="전송 종료 후 전달 대기 시간 (초)")
+    parser.add_argument("--classifier-latency-ms", type=float, default=20.0, help="stub 감지 백엔드 지연 시간")
+    parser.add_argument("--moderation-mode", choices=["blocking", "optimistic"], default="blocking")
+    parser.add_argument("--no-prefilter", dest="prefilter", action="store_false", help="사전 필터 비활성화")
+    parser.add_argument("--connect-batch", type=int, default=200, help="동시에 접속시키는 클라이언트 수")
+    parser.add_argument("--lag-interval-ms", type=float, default=10.0, help="이벤트 루프 지연 측정 주기")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--output", help="결과 JSON 저장 경로 (없으면 stdout 출력)")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    with tempfile.TemporaryDirectory(prefix="chat-bench-") as workdir:
+        configure_environment(workdir, args)
+        result = asyncio.run(run(args))
+
+    output = json.dumps(result, indent=2, ensure_ascii=False)
+    if args.output:
+        os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(output + "\n")
+        latency = result["delivery_latency_ms"]
+        print(
+            f"{result['messages_sent']} messages, {result['deliveries']}/{result['deliveries_expected']} deliveries, "
+            f"p50 {latency.get('p50', 0):.1f} ms, p99 {latency.get('p99', 0):.1f} ms -> {args.output}"
+        )
+    else:
+        print(output)
+
+
+if __name__ == "__main__":
+    main()
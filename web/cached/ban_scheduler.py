@@ -0,0 +1,75 @@
+import asyncio
+import logging
+import time
+from typing import Awaitable, Callable, List, Optional
+
+from config.settings import settings
+from security.principal import principal_cache
+from .redis_manager import RedisManager
+
+logger = logging.getLogger(__name__)
+
+
+class BanScheduler:
+    """
+    차단 자동 해제 스케줄러
+
+    차단 해제 시각은 Redis sorted set(bans:expiry)에 저장되어 재시작 후에도 유지되고,
+    하나의 asyncio 백그라운드 태스크가 해제 시각이 지난 유저를 묶어서 처리한다.
+    DB 업데이트는 멱등적이라 여러 워커가 동시에 실행되어도 안전하다.
+    """
+
+    def __init__(
+        self,
+        redis_manager: RedisManager,
+        unban_members: Callable[[List[int]], Awaitable[None]],
+        poll_interval: float = settings.ban_poll_interval,
+        batch_size: int = settings.ban_batch_size,
+    ):
+        self.redis = redis_manager
+        self.unban_members = unban_members  # DB 차단 해제 (ChatStore.unban_members)
+        self.poll_interval = poll_interval
+        self.batch_size = batch_size
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self):
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+    async def _run(self):
+        while True:
+            try:
+                # 한 번에 batch_size 보다 많이 밀려 있으면 바로 이어서 처리
+                while await self.process_due() >= self.batch_size:
+                    pass
+            except Exception:
+                logger.exception("Ban expiry processing failed")
+            await asyncio.sleep(self.poll_interval)
+
+    async def process_due(self) -> int:
+        """해제 시각이 지난 차단을 일괄 해제 - 처리한 유저 수 반환"""
+        now = time.time()
+        user_ids = await self.redis.claim_due_unbans(now, self.batch_size)
+        if not user_ids:
+            return 0
+
+        try:
+            await self.unban_members(user_ids)
+        except Exception:
+            # DB 실패 시 다시 예약하여 다음 주기에 재시도
+            for user_id in user_ids:
+                await self.redis.schedule_unban(user_id, now)
+            raise
+
+        # 🚀 차단 키 및 혐오 표현 감지 횟수 초기화
+        await self.redis.release_bans(user_ids)
+        for user_id in user_ids:
+            principal_cache.invalidate_user(user_id)
+        logger.info("Unbanned %d users: %s", len(user_ids), user_ids)
+        return len(user_ids)
@@ -0,0 +1,89 @@
+import logging
+from typing import Awaitable, Callable, List, Optional
+
+import redis
+
+from config.settings import settings
+from .redis_manager import RedisManager
+
+logger = logging.getLogger(__name__)
+
+
+class HistoryCache:
+    """
+    채팅방 최근 메시지 캐시 (read-through / write-through)
+
+    - 브로드캐스트된 메시지는 append 로 Redis 에 바로 추가
+      (캐시가 없는 채팅방은 대기 리스트에 보관했다가 채울 때 합침)
+    - 최신 페이지 조회는 Redis 에서 응답, 캐시가 없으면 DB 에서 채운 뒤 응답
+    - 아직 저장되지 않은 메시지가 있는 채팅방은 전체 메시지(full)로 표시하지 않음
+    - 이전 페이지(커서 조회)는 호출자가 DB 에서 직접 조회
+    """
+
+    def __init__(
+        self,
+        redis_manager: RedisManager,
+        depth: int = settings.history_cache_depth,
+        memory_budget: int = settings.history_cache_memory_budget,
+        ttl: int = settings.history_cache_ttl,
+        has_pending: Optional[Callable[[int], bool]] = None,
+    ):
+        self.redis = redis_manager
+        self.has_pending = has_pending
+        self.depth = depth
+        self.memory_budget = memory_budget
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+
+    async def append(self, room_id: int, record: dict):
+        """메시지 레코드 (id, username, content, timestamp) 캐시에 추가"""
+        try:
+            await self.redis.cache_message(room_id, record, self.depth, self.memory_budget, self.ttl)
+        except redis.RedisError as e:
+            logger.warning("History cache append failed for room %s: %s", room_id, e)
+
+    async def remove(self, room_id: int, message_id: int):
+        try:
+            await self.redis.remove_cached_message(room_id, message_id)
+        except redis.RedisError as e:
+            logger.warning("History cache removal failed for room %s: %s", room_id, e)
+
+    async def get_latest(
+        self, room_id: int, limit: int, load: Callable[[int], Awaitable[List[dict]]]
+    ) -> List[dict]:
+        """
+        최신 메시지 limit 개 조회 (시간순)
+
+        Args:
+            load: 최신 메시지 n 개를 DB 에서 시간순으로 조회하는 함수
+        """
+        try:
+            records, full = await self.redis.get_cached_messages(room_id)
+        except redis.RedisError as e:
+            logger.warning("History cache read failed for room %s: %s", room_id, e)
+            return await load(limit)
+
+        if records is not None and (len(records) >= limit or full):
+            self.hits += 1
+            return records[-limit:]
+
+        # 캐시 미스 - DB 에서 조회 후 캐시 채우기
+        self.misses += 1
+        count = max(limit, self.depth)
+        rows = await load(count)
+        full = len(rows) < count and len(rows) <= self.depth
+        if full and self.has_pending is not None and self.has_pending(room_id):
+            full = False
+        try:
+            cached = await self.redis.warm_message_cache(
+                room_id, rows[-self.depth:], full, self.depth, self.memory_budget, self.ttl
+            )
+        except redis.RedisError as e:
+            logger.warning("History cache warm-up failed for room %s: %s", room_id, e)
+            return rows[-limit:]
+
+        # 아직 DB 에 없는 메시지 (대기 리스트에서 합쳐진 메시지) 포함
+        merged = {row["id"]: row for row in rows}
+        merged.update((record["id"], record) for record in cached)
+        return sorted(merged.values(), key=lambda row: (row["timestamp"], row["id"]))[-limit:]
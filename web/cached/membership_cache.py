@@ -0,0 +1,77 @@
+import logging
+from typing import Awaitable, Callable, List
+
+import redis
+
+from config.settings import settings
+from .redis_manager import RedisManager
+
+logger = logging.getLogger(__name__)
+
+
+class RoomMembershipCache:
+    """
+    채팅방 멤버 여부 캐시 (채팅방별 Redis set)
+
+    - 캐시가 없으면 DB 에서 멤버 id 만 조회하여 채움
+    - 참여/초대/나가기 시 DB 반영 후 set 에 추가/제거
+    - 캐시에서 멤버가 아니라고 나오면 DB 기본키 조회로 한 번 더 확인
+      (캐시를 채우는 중에 참여한 경우 등)
+    - Redis 장애 시 DB 기본키 조회로 응답
+    """
+
+    def __init__(
+        self,
+        redis_manager: RedisManager,
+        exists: Callable[[int, int], Awaitable[bool]],
+        load: Callable[[int], Awaitable[List[int]]],
+        ttl: int = settings.room_members_cache_ttl,
+    ):
+        self.redis = redis_manager
+        self.exists = exists
+        self.load = load
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+
+    async def is_member(self, room_id: int, member_id: int) -> bool:
+        try:
+            cached = await self.redis.get_room_membership(room_id, member_id)
+        except redis.RedisError as e:
+            logger.warning("Room membership lookup failed for room %s: %s", room_id, e)
+            return await self.exists(room_id, member_id)
+
+        if cached:
+            self.hits += 1
+            return True
+
+        if cached is None:
+            # 캐시 미스 - DB 에서 멤버 목록 조회 후 캐시 채우기
+            self.misses += 1
+            member_ids = await self.load(room_id)
+            try:
+                await self.redis.warm_room_members(room_id, member_ids, self.ttl)
+            except redis.RedisError as e:
+                logger.warning("Room membership warm-up failed for room %s: %s", room_id, e)
+            return member_id in member_ids
+
+        # 캐시에 없음 - 캐시를 채운 뒤 참여했을 수 있으므로 DB 로 확인
+        if not await self.exists(room_id, member_id):
+            return False
+        await self.added(room_id, member_id)
+        return True
+
+    async def added(self, room_id: int, member_id: int):
+        try:
+            await self.redis.add_room_member(room_id, member_id)
+        except redis.RedisError as e:
+            logger.warning("Room membership add failed for room %s: %s", room_id, e)
+
+    async def removed(self, room_id: int, member_id: int):
+        try:
+            await self.redis.remove_room_member(room_id, member_id)
+        except redis.RedisError as e:
+            logger.warning("Room membership removal failed for room %s: %s", room_id, e)
+
+    def stats(self) -> dict:
+        return {"hits": self.hits, "misses": self.misses}
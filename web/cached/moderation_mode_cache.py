@@ -0,0 +1,57 @@
+import logging
+from typing import Awaitable, Callable, Optional
+
+import redis
+
+from config.settings import settings
+from .redis_manager import RedisManager
+
+logger = logging.getLogger(__name__)
+
+
+class RoomModerationModeCache:
+    """
+    채팅방 검열 모드 캐시 (원본은 DB chat_rooms.moderation_mode)
+
+    - 캐시가 없으면 DB 에서 조회하여 채움 (DB 값이 없으면 기본 모드)
+    - 변경 시 DB 반영 후 캐시 갱신
+    - Redis 장애 시 DB 조회로 응답
+    """
+
+    def __init__(
+        self,
+        redis_manager: RedisManager,
+        load: Callable[[int], Awaitable[Optional[str]]],
+        save: Callable[[int, str], Awaitable[None]],
+        default: str = settings.moderation_default_mode,
+        ttl: int = settings.moderation_mode_cache_ttl,
+    ):
+        self.redis = redis_manager
+        self.load = load
+        self.save = save
+        self.default = default
+        self.ttl = ttl
+
+    async def get(self, room_id: int) -> str:
+        try:
+            cached = await self.redis.get_room_moderation_mode(room_id)
+        except redis.RedisError as e:
+            logger.warning("Moderation mode lookup failed for room %s: %s", room_id, e)
+            return await self.load(room_id) or self.default
+
+        if cached is not None:
+            return cached
+
+        mode = await self.load(room_id) or self.default
+        await self._cache(room_id, mode)
+        return mode
+
+    async def set(self, room_id: int, mode: str):
+        await self.save(room_id, mode)
+        await self._cache(room_id, mode)
+
+    async def _cache(self, room_id: int, mode: str):
+        try:
+            await self.redis.set_room_moderation_mode(room_id, mode, self.ttl)
+        except redis.RedisError as e:
+            logger.warning("Moderation mode cache update failed for room %s: %s", room_id, e)
@@ -0,0 +1,150 @@
+import asyncio
+import logging
+import math
+import time
+from typing import Optional, Tuple
+
+import redis
+from fastapi import HTTPException, Request, status
+
+from config.settings import settings
+from utils.metrics import RATE_LIMITED
+from .redis_manager import RedisManager, redis_manager
+
+logger = logging.getLogger(__name__)
+
+# 제한 초과 시 동작
+RATE_LIMIT_THROTTLE = "throttle"  # max_delay 까지 늦춰서 처리
+RATE_LIMIT_DROP = "drop"          # 바로 버림
+
+
+class TokenBucket:
+    """프로세스 내부 토큰 버킷 (연결별 빠른 경로, Redis 호출 없음)"""
+
+    def __init__(self, rate: float, burst: int):
+        self.rate = rate
+        self.burst = burst
+        self.tokens = float(burst)
+        self.updated = time.monotonic()
+
+    def reserve(self, cost: int = 1, max_wait: float = 0.0) -> Tuple[bool, float]:
+        """
+        토큰 소비 (부족하면 max_wait 안에 채워질 때만 미리 예약)
+
+        Returns:
+            (허용 여부, 대기 시간(초))
+        """
+        now = time.monotonic()
+        self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+        wait = max(0.0, (cost - self.tokens) / self.rate)
+        if wait > max_wait:
+            return False, wait
+        self.tokens -= cost
+        return True, wait
+
+
+class RateLimiter:
+    """
+    메시지 / 로그인 / 회원가입 전송 제한
+
+    - 연결별 버킷은 프로세스 내부에서 먼저 확인하여 폭주하는 연결은 Redis 까지 가지 않음
+    - 사용자별 / 채팅방별 버킷은 Redis Lua 스크립트로 모든 워커에 걸쳐 원자적으로 확인 (1회 왕복)
+    - Redis 장애 시 연결별 제한만 적용 (메시지 전송은 계속 허용)
+    """
+
+    def __init__(
+        self,
+        redis_manager: RedisManager,
+        enabled: bool = settings.rate_limit_enabled,
+        action: str = settings.rate_limit_action,
+        max_delay: float = settings.rate_limit_max_delay,
+    ):
+        self.redis = redis_manager
+        self.enabled = enabled
+        self.action = action
+        self.max_delay = max_delay if action == RATE_LIMIT_THROTTLE else 0.0
+
+    def connection_bucket(self) -> TokenBucket:
+        return TokenBucket(settings.rate_limit_connection_rate, settings.rate_limit_connection_burst)
+
+    async def acquire_message(self, bucket: TokenBucket, user_id: int, room_id: int) -> Optional[float]:
+        """
+        메시지 전송 허용 확인 (throttle 이면 필요한 만큼 기다린 뒤 반환)
+
+        Returns:
+            허용되면 None, 거절되면 다시 시도할 수 있을 때까지의 시간(초)
+        """
+        if not self.enabled:
+            return None
+
+        allowed, wait = bucket.reserve(1, self.max_delay)
+        if not allowed:
+            self._record("connection", RATE_LIMIT_DROP)
+            return wait
+
+        try:
+            allowed, global_wait = await self.redis.consume_tokens(
+                [
+                    (f"user:{user_id}", settings.rate_limit_user_rate, settings.rate_limit_user_burst),
+                    (f"room:{room_id}", settings.rate_limit_room_rate, settings.rate_limit_room_burst),
+                ],
+                max_wait=self.max_delay - wait,
+            )
+        except redis.RedisError as e:
+            logger.warning("Global rate limit check failed, using the connection limit only: %s", e)
+            allowed, global_wait = True, 0.0
+
+        if not allowed:
+            self._record("user_room", RATE_LIMIT_DROP)
+            return global_wait
+
+        wait = max(wait, global_wait)
+        if wait > 0:
+            self._record("connection" if global_wait == 0 else "user_room", RATE_LIMIT_THROTTLE)
+            await asyncio.sleep(wait)
+        return None
+
+    async def check_request(self, scope: str, key: str, rate: float, burst: int):
+        """REST 요청 제한 (초과 시 429)"""
+        if not self.enabled:
+            return
+        try:
+            allowed, wait = await self.redis.consume_tokens([(f"{scope}:{key}", rate, burst)])
+        except redis.RedisError as e:
+            logger.warning("Rate limit check for %s failed: %s", scope, e)
+            return
+
+        if not allowed:
+            self._record(scope, RATE_LIMIT_DROP)
+            raise HTTPException(
+                status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+                detail="Too many requests, please try again later",
+                headers={"Retry-After": str(max(1, math.ceil(wait)))},
+            )
+
+    @staticmethod
+    def _record(scope: str, action: str):
+        RATE_LIMITED.labels(scope, action).inc()
+
+
+rate_limiter = RateLimiter(redis_manager)
+
+
+def _client_ip(request: Request) -> str:
+    return request.client.host if request.client else "unknown"
+
+
+async def limit_login(request: Request):
+    """로그인 요청 제한 (클라이언트 IP 기준)"""
+    await rate_limiter.check_request(
+        "login", _client_ip(request), settings.rate_limit_login_rate, settings.rate_limit_login_burst
+    )
+
+
+async def limit_register(request: Request):
+    """회원가입 요청 제한 (클라이언트 IP 기준)"""
+    await rate_limiter.check_request(
+        "register", _client_ip(request), settings.rate_limit_register_rate, settings.rate_limit_register_burst
+    )
@@ -1,89 +1,462 @@
+import json
+import logging
+import time
+from typing import Dict, List, Optional, Tuple
+
 import redis
-import threading
-from sqlalchemy.orm import Session
-from datetime import datetime, timedelta
-from config.models import Member  # Member 모델 import
+import redis.asyncio as aioredis
+
+from config.settings import settings
+from utils.metrics import REDIS_COMMAND_SECONDS
+
+logger = logging.getLogger(__name__)
+
+BAN_EXPIRY_KEY = "bans:expiry"  # 차단 해제 예정 시각 (sorted set, score = unix time)
+
+# 채팅방 메시지 캐시 추가 - warm 상태(meta 키 존재)면 추가 후 개수/메모리 한도 적용,
+# 아직 채우지 않은(cold) 채팅방이면 대기 리스트에 보관하여 warm-up 시 합침
+# KEYS[1]=메시지 리스트, KEYS[2]=meta 해시, KEYS[3]=대기 리스트 / ARGV: 메시지, 최대 개수, 메모리 한도(바이트), TTL
+PUSH_MESSAGE_SCRIPT = """
+if redis.call('EXISTS', KEYS[2]) == 0 then
+    redis.call('LPUSH', KEYS[3], ARGV[1])
+    redis.call('LTRIM', KEYS[3], 0, tonumber(ARGV[2]) - 1)
+    redis.call('EXPIRE', KEYS[3], ARGV[4])
+    return 0
+end
+redis.call('LPUSH', KEYS[1], ARGV[1])
+local bytes = redis.call('HINCRBY', KEYS[2], 'bytes', string.len(ARGV[1]))
+local depth = tonumber(ARGV[2])
+local budget = tonumber(ARGV[3])
+local length = redis.call('LLEN', KEYS[1])
+while length > depth or (budget > 0 and bytes > budget and length > 1) do
+    local removed = redis.call('RPOP', KEYS[1])
+    bytes = redis.call('HINCRBY', KEYS[2], 'bytes', -string.len(removed))
+    redis.call('HSET', KEYS[2], 'full', '0')
+    length = length - 1
+end
+redis.call('EXPIRE', KEYS[1], ARGV[4])
+redis.call('EXPIRE', KEYS[2], ARGV[4])
+return 1
+"""
+
+# 채팅방 메시지 캐시 (및 대기 리스트) 에서 id 로 메시지 제거
+REMOVE_MESSAGE_SCRIPT = """
+for _, record in ipairs(redis.call('LRANGE', KEYS[3], 0, -1)) do
+    if tostring(cjson.decode(record)['id']) == ARGV[1] then
+        redis.call('LREM', KEYS[3], 1, record)
+    end
+end
+local records = redis.call('LRANGE', KEYS[1], 0, -1)
+for _, record in ipairs(records) do
+    if tostring(cjson.decode(record)['id']) == ARGV[1] then
+        redis.call('LREM', KEYS[1], 1, record)
+        redis.call('HINCRBY', KEYS[2], 'bytes', -string.len(record))
+        return 1
+    end
+end
+return 0
+"""
+
+# DB 에서 조회한 메시지, 기존 캐시, 대기 리스트(cold 상태에서 추가된 메시지)를 합쳐 (timestamp, id) 순으로 캐시 채우기
+# KEYS[1]=메시지 리스트, KEYS[2]=meta 해시, KEYS[3]=대기 리스트
+# ARGV: 최대 개수, 메모리 한도(바이트), TTL, 전체 여부(0/1), 이후 DB 메시지들 / 반환: 캐시된 메시지 (최신순)
+WARM_MESSAGE_CACHE_SCRIPT = """
+local records = {}
+local seen = {}
+local function add(value)
+    local record = cjson.decode(value)
+    local id = tonumber(record['id'])
+    if not seen[id] then
+        seen[id] = true
+        records[#records + 1] = {id = id, timestamp = tostring(record['timestamp']), value = value}
+    end
+end
+for i = 5, #ARGV do
+    add(ARGV[i])
+end
+for _, key in ipairs({KEYS[1], KEYS[3]}) do
+    for _, value in ipairs(redis.call('LRANGE', key, 0, -1)) do
+        add(value)
+    end
+end
+table.sort(records, function(a, b)
+    if a.timestamp ~= b.timestamp then
+        return a.timestamp > b.timestamp
+    end
+    return a.id > b.id
+end)
+
+local depth = tonumber(ARGV[1])
+local budget = tonumber(ARGV[2])
+local full = ARGV[4]
+local bytes = 0
+local count = 0
+local cached = {}
+redis.call('DEL', KEYS[1], KEYS[2], KEYS[3])
+for _, record in ipairs(records) do
+    local size = string.len(record.value)
+    if count >= depth or (budget > 0 and count > 0 and bytes + size > budget) then
+        full = '0'
+        break
+    end
+    redis.call('RPUSH', KEYS[1], record.value)
+    cached[#cached + 1] = record.value
+    bytes = bytes + size
+    count = count + 1
+end
+if count > 0 then
+    redis.call('EXPIRE', KEYS[1], ARGV[3])
+end
+redis.call('HSET', KEYS[2], 'bytes', bytes, 'full', full)
+redis.call('EXPIRE', KEYS[2], ARGV[3])
+return cached
+"""
+
+# 해제 시각이 지난 차단만 원자적으로 가져오기 (다른 워커와 중복 처리 방지, 재차단된 유저는 제외)
+# KEYS[1]=bans:expiry / ARGV: 현재 시각, 최대 개수
+CLAIM_UNBANS_SCRIPT = """
+local due = redis.call('ZRANGEBYSCORE', KEYS[1], '-inf', ARGV[1], 'LIMIT', 0, ARGV[2])
+for _, user_id in ipairs(due) do
+    redis.call('ZREM', KEYS[1], user_id)
+end
+return due
+"""
+
+# 혐오 표현 감지 횟수 증가 + 경고 횟수 TTL + 차단 판정 + 차단 키/해제 예약을 한 번에 처리
+# KEYS[1]=hate_count, KEYS[2]=is_banned, KEYS[3]=bans:expiry
+# ARGV: 유저 id, 차단 기준 횟수, 경고 횟수 유지 시간(초), 차단 시간(초), 현재 시각
+REGISTER_HATE_SPEECH_SCRIPT = """
+local count = redis.call('INCR', KEYS[1])
+if redis.call('TTL', KEYS[1]) < 0 then
+    redis.call('EXPIRE', KEYS[1], ARGV[3])
+end
+local banned = 0
+if count >= tonumber(ARGV[2]) then
+    redis.call('SETEX', KEYS[2], ARGV[4], '1')
+    redis.call('ZADD', KEYS[3], tonumber(ARGV[5]) + tonumber(ARGV[4]), ARGV[1])
+    banned = 1
+end
+return {count, banned}
+"""
+
+# 채팅방 멤버 캐시에 추가 - DB 에서 채운(warm) 경우에만 추가
+# KEYS[1]=멤버 set / ARGV: 멤버 id
+ADD_ROOM_MEMBER_SCRIPT = """
+if redis.call('EXISTS', KEYS[1]) == 0 then
+    return 0
+end
+return redis.call('SADD', KEYS[1], ARGV[1])
+"""
+
+# 멤버가 없는 채팅방도 캐시되도록 멤버 set 에 항상 포함되는 값
+ROOM_MEMBERS_SENTINEL = "*"
+
+# 토큰 버킷 여러 개를 한 번에 확인 - 모두 max_wait 안에 토큰이 생기면 전부 차감(부족분은 예약)
+# KEYS=버킷 해시들 / ARGV: 현재 시각, 소비 토큰 수, 최대 대기(초), 이후 버킷별 (초당 충전량, 최대 토큰)
+# 반환: {허용 여부, 대기 시간(ms)}
+CONSUME_TOKENS_SCRIPT = """
+local now = tonumber(ARGV[1])
+local cost = tonumber(ARGV[2])
+local max_wait = tonumber(ARGV[3])
+local tokens = {}
+local wait = 0
+for i, key in ipairs(KEYS) do
+    local rate = tonumber(ARGV[2 + i * 2])
+    local burst = tonumber(ARGV[3 + i * 2])
+    local state = redis.call('HMGET', key, 'tokens', 'ts')
+    local available = tonumber(state[1]) or burst
+    local updated = tonumber(state[2]) or now
+    available = math.min(burst, available + math.max(0, now - updated) * rate)
+    tokens[i] = available
+    if available < cost then
+        wait = math.max(wait, (cost - available) / rate)
+    end
+end
+if wait > max_wait then
+    return {0, math.ceil(wait * 1000)}
+end
+for i, key in ipairs(KEYS) do
+    local rate = tonumber(ARGV[2 + i * 2])
+    local burst = tonumber(ARGV[3 + i * 2])
+    redis.call('HSET', key, 'tokens', tostring(tokens[i] - cost), 'ts', ARGV[1])
+    redis.call('PEXPIRE', key, math.ceil((burst + cost) / rate * 1000) + 1000)
+end
+return {1, math.ceil(wait * 1000)}
+"""
+
+class InstrumentedPipeline(aioredis.client.Pipeline):
+    """파이프라인 실행 시간 기록 (왕복 한 번)"""
+
+    async def execute(self, raise_on_error: bool = True):
+        started = time.perf_counter()
+        try:
+            return await super().execute(raise_on_error)
+        finally:
+            REDIS_COMMAND_SECONDS.labels("PIPELINE").observe(time.perf_counter() - started)
+
+
+class InstrumentedRedis(aioredis.Redis):
+    """명령별 왕복 시간 기록 (Lua 스크립트는 EVALSHA)"""
+
+    async def execute_command(self, *args, **options):
+        started = time.perf_counter()
+        try:
+            return await super().execute_command(*args, **options)
+        finally:
+            REDIS_COMMAND_SECONDS.labels(str(args[0]).upper()).observe(time.perf_counter() - started)
+
+    def pipeline(self, transaction: bool = True, shard_hint: Optional[str] = None) -> InstrumentedPipeline:
+        return InstrumentedPipeline(self.connection_pool, self.response_callbacks, transaction, shard_hint)
+
 
 class RedisManager:
+    """
+    비동기 Redis 클라이언트 (redis.asyncio)
+
+    프로세스 전체가 하나의 커넥션 풀을 공유한다. 풀은 앱 lifespan 의 connect 에서
+    생성되며, 그 전에 client 에 접근하면 그 시점에 생성된다.
+    """
+
+    def __init__(
+        self,
+        host: str = settings.redis_host,
+        port: int = settings.redis_port,
+        password: Optional[str] = settings.redis_password,
+        db: int = settings.redis_db,
+        max_connections: int = settings.redis_max_connections,
+    ):
+        self.host = host
+        self.port = port
+        self.password = password
+        self.db = db
+        self.max_connections = max_connections
+        self.pool: Optional[aioredis.BlockingConnectionPool] = None
+        self._client: Optional[aioredis.Redis] = None
+        self._scripts = {}
+
+    @property
+    def client(self) -> aioredis.Redis:
+        if self._client is None:
+            self._create_client()
+        return self._client
+
+    def _create_client(self):
+        # 풀이 가득 차면 예외 대신 pool_timeout 까지 대기
+        self.pool = aioredis.BlockingConnectionPool(
+            host=self.host,
+            port=self.port,
+            password=self.password,
+            db=self.db,
+            max_connections=self.max_connections,
+            timeout=settings.redis_pool_timeout,
+            socket_timeout=settings.redis_socket_timeout,
+            socket_connect_timeout=settings.redis_connect_timeout,
+            health_check_interval=settings.redis_health_check_interval,
+            decode_responses=True,
+        )
+        self._client = InstrumentedRedis(connection_pool=self.pool)
+        self._scripts = {}
+
+    def _script(self, source: str):
+        """Lua 스크립트 (클라이언트별로 한 번만 등록, 서버에 없으면 호출 시 자동 로드)"""
+        script = self._scripts.get(source)
+        if script is None:
+            script = self._scripts[source] = self.client.register_script(source)
+        return script
+
+    async def connect(self) -> bool:
+        """커넥션 풀 생성 및 연결 확인 (lifespan 시작 시 호출)"""
+        if self._client is None:
+            self._create_client()
+        healthy = await self.ping()
+        if not healthy:
+            logger.warning("Redis %s:%s is not reachable yet", self.host, self.port)
+        return healthy
+
+    async def close(self):
+        """커넥션 풀 정리 (lifespan 종료 시 호출)"""
+        if self._client is not None:
+            await self._client.aclose()
+            await self.pool.disconnect()
+            self._client = None
+            self.pool = None
+
+    async def ping(self) -> bool:
+        """헬스 체크"""
+        try:
+            return bool(await self.client.ping())
+        except redis.RedisError:
+            return False
+
+    def pipeline(self, transaction: bool = False):
+        """여러 명령을 한 번의 왕복으로 전송하는 파이프라인"""
+        return self.client.pipeline(transaction=transaction)
+
+    async def cache_message(self, room_id: int, record: dict, max_messages: int = 50, memory_budget: int = 0, ttl: int = 86400):
+        """
+        특정 채팅방의 메시지 캐싱 (write-through)
 
-    def __init__(self, host: str = "redis-server", port: int = 6379, password: str = None):
-        self.client = redis.StrictRedis(
-            host=host,
-            port=port,
-            password=password,
-            decode_responses=True
+        DB 에서 캐시를 채운(warm) 채팅방에만 추가되며, max_messages 개 또는
+        memory_budget 바이트를 넘으면 오래된 메시지부터 제거
+        (cold 채팅방은 대기 리스트에 보관했다가 warm-up 시 합침)
+        """
+        await self._script(PUSH_MESSAGE_SCRIPT)(
+            keys=[f"chatroom:{room_id}", f"chatroom:{room_id}:meta", f"chatroom:{room_id}:pending"],
+            args=[json.dumps(record, ensure_ascii=False), max_messages, memory_budget, ttl],
         )
 
-    def cache_message(self, room_id: int, message: str, max_messages: int = 50):
-        """특정 채팅방의 메시지 캐싱"""
-        key = f"chatroom:{room_id}"
-        self.client.lpush(key, message)
-        self.client.ltrim(key, 0, max_messages - 1)
+    async def get_cached_messages(self, room_id: int):
+        """
+        특정 채팅방의 캐싱된 메시지 조회 (시간순)
 
-    def get_cached_messages(self, room_id: int):
-        """특정 채팅방의 캐싱된 메시지 조회"""
-        key = f"chatroom:{room_id}"
-        return self.client.lrange(key, 0, -1)
+        Returns:
+            (메시지 리스트, 채팅방 전체 메시지 여부) - 캐시가 없으면 (None, False)
+        """
+        pipe = self.pipeline()
+        pipe.hget(f"chatroom:{room_id}:meta", "full")
+        pipe.exists(f"chatroom:{room_id}:meta")
+        pipe.lrange(f"chatroom:{room_id}", 0, -1)
+        full, warm, records = await pipe.execute()
+        if not warm:
+            return None, False
+        return [json.loads(record) for record in reversed(records)], full == "1"
 
-    def increment_hate_count(self, user_id: int, db: Session, max_limit: int = 3) -> bool:
+    async def warm_message_cache(
+        self, room_id: int, records: list, full: bool, max_messages: int = 50, memory_budget: int = 0, ttl: int = 86400
+    ):
         """
-        유저의 혐오 표현 경고 횟수 증가 및 차단 여부 확인 (50초 후 자동 해제 포함)
+        DB 에서 조회한 최근 메시지(시간순)로 채팅방 캐시 채우기
+
+        아직 DB 에 저장되지 않아 조회되지 않은 메시지는 대기 리스트에서 합쳐지며,
+        max_messages 개 또는 memory_budget 바이트를 넘는 오래된 메시지는 제외
+
+        Returns:
+            캐시된 메시지 리스트 (시간순)
         """
-        key = f"user:{user_id}:hate_count"
-        count = self.client.incr(key)  # 🚀 혐오 표현 감지 횟수 증가
-
-        if count == 1:
-            self.client.expire(key, 50)  # ⏳ 50초 후 초기화 (경고 횟수 리셋)
-
-        # 🚨 3회 이상 혐오 표현 감지되면 차단
-        if count >= max_limit:
-            self.update_ban_status(user_id, True, db)
-            
-            # 💡 50초 후 차단 해제 & 혐오 표현 횟수 초기화
-            threading.Timer(50, self.unban_user, args=(user_id, db)).start()
-            return True  # 차단됨
-
-        return False  # 아직 차단되지 않음
-    
-    def get_hate_count(self, user_id: int) -> int:
-        """유저의 혐오 표현 감지 횟수 반환"""
-        key = f"user:{user_id}:hate_count"
-        count = self.client.get(key)
-        return int(count) if count else 0  # 값이 없으면 0 반환
-
-
-    def unban_user(self, user_id: int, db: Session):
+        cached = await self._script(WARM_MESSAGE_CACHE_SCRIPT)(
+            keys=[f"chatroom:{room_id}", f"chatroom:{room_id}:meta", f"chatroom:{room_id}:pending"],
+            args=[max_messages, memory_budget, ttl, "1" if full else "0"]
+            + [json.dumps(record, ensure_ascii=False) for record in records],
+        )
+        return [json.loads(record) for record in reversed(cached)]
+
+    async def remove_cached_message(self, room_id: int, message_id: int):
+        """회수된 메시지를 채팅방 캐시에서 제거"""
+        await self._script(REMOVE_MESSAGE_SCRIPT)(
+            keys=[f"chatroom:{room_id}", f"chatroom:{room_id}:meta", f"chatroom:{room_id}:pending"], args=[message_id]
+        )
+
+    async def get_room_membership(self, room_id: int, member_id: int) -> Optional[bool]:
+        """채팅방 멤버 여부 조회 - 캐시가 없으면 None"""
+        pipe = self.pipeline()
+        pipe.exists(f"chatroom:{room_id}:members")
+        pipe.sismember(f"chatroom:{room_id}:members", member_id)
+        warm, is_member = await pipe.execute()
+        if not warm:
+            return None
+        return bool(is_member)
+
+    async def warm_room_members(self, room_id: int, member_ids: List[int], ttl: int = 3600):
+        """DB 에서 조회한 멤버 id 로 채팅방 멤버 캐시 채우기"""
+        key = f"chatroom:{room_id}:members"
+        pipe = self.pipeline(transaction=True)
+        pipe.delete(key)
+        pipe.sadd(key, ROOM_MEMBERS_SENTINEL, *member_ids)
+        pipe.expire(key, ttl)
+        await pipe.execute()
+
+    async def add_room_member(self, room_id: int, member_id: int):
+        await self._script(ADD_ROOM_MEMBER_SCRIPT)(keys=[f"chatroom:{room_id}:members"], args=[member_id])
+
+    async def remove_room_member(self, room_id: int, member_id: int):
+        await self.client.srem(f"chatroom:{room_id}:members", member_id)
+
+    async def get_verdict(self, key: str):
+        """캐싱된 혐오 표현 감지 결과 조회"""
+        value = await self.client.get(f"verdict:{key}")
+        return json.loads(value) if value else None
+
+    async def set_verdict(self, key: str, verdict: dict, ttl: int):
+        """혐오 표현 감지 결과 캐싱"""
+        await self.client.setex(f"verdict:{key}", ttl, json.dumps(verdict))
+
+    async def get_room_moderation_mode(self, room_id: int) -> Optional[str]:
+        """캐시된 채팅방 검열 모드 조회 (캐시가 없으면 None)"""
+        return await self.client.get(f"chatroom:{room_id}:moderation_mode")
+
+    async def set_room_moderation_mode(self, room_id: int, mode: str, ttl: int = 86400):
+        """채팅방 검열 모드 캐시 (원본은 chat_rooms.moderation_mode)"""
+        await self.client.set(f"chatroom:{room_id}:moderation_mode", mode, ex=ttl)
+
+    async def register_hate_speech(self, user_id: int, max_limit: int = 3, window_seconds: int = 50, ban_seconds: int = 50):
+        """
+        혐오 표현 감지 처리 (Lua 스크립트로 1회 왕복, 동시 연결에서도 원자적)
+
+        Returns:
+            (경고 횟수, 차단 여부)
         """
-        50초 후 자동으로 차단 해제
+        count, banned = await self._script(REGISTER_HATE_SPEECH_SCRIPT)(
+            keys=[f"user:{user_id}:hate_count", f"user:{user_id}:is_banned", BAN_EXPIRY_KEY],
+            args=[user_id, max_limit, window_seconds, ban_seconds, time.time()],
+        )
+        return int(count), bool(banned)
+
+    async def consume_tokens(self, buckets: List[Tuple[str, float, int]], cost: int = 1, max_wait: float = 0.0):
         """
-        self.update_ban_status(user_id, False, db)  # 차단 해제
-        self.reset_hate_count(user_id)  # 🚀 혐오 표현 감지 횟수 초기화
-        print(f"✅ User {user_id} has been unbanned after 50 seconds.")
+        토큰 버킷 (키, 초당 충전량, 최대 토큰) 여러 개에서 원자적으로 토큰 소비 (1회 왕복)
 
-    def reset_hate_count(self, user_id: int):
-        """유저의 혐오 표현 경고 횟수 초기화"""
-        key = f"user:{user_id}:hate_count"
-        self.client.delete(key)
+        Returns:
+            (허용 여부, 대기 시간(초)) - 허용된 경우 대기 시간만큼 기다린 뒤 처리
+        """
+        args = [time.time(), cost, max_wait]
+        for _, rate, burst in buckets:
+            args += [rate, burst]
+        allowed, wait_ms = await self._script(CONSUME_TOKENS_SCRIPT)(
+            keys=[f"ratelimit:{key}" for key, _, _ in buckets],
+            args=args,
+        )
+        return bool(allowed), int(wait_ms) / 1000
 
-    def check_ban_status(self, user_id: int) -> bool:
+    async def schedule_unban(self, user_id: int, unban_at: float):
+        """차단 해제 시각 예약 (재차단 시 시각 갱신)"""
+        await self.client.zadd(BAN_EXPIRY_KEY, {str(user_id): unban_at})
+
+    async def claim_due_unbans(self, now: float, limit: int) -> List[int]:
+        """해제 시각이 지난 유저 id 를 가져오고 예약 목록에서 제거"""
+        return [int(user_id) for user_id in await self._script(CLAIM_UNBANS_SCRIPT)(keys=[BAN_EXPIRY_KEY], args=[now, limit])]
+
+    async def release_bans(self, user_ids: List[int]):
+        """차단 키 및 혐오 표현 감지 횟수 일괄 삭제"""
+        keys = []
+        for user_id in user_ids:
+            keys += [f"user:{user_id}:is_banned", f"user:{user_id}:hate_count"]
+        if keys:
+            await self.client.delete(*keys)
+
+    async def check_ban_status(self, user_id: int) -> bool:
         """유저 차단 상태 확인"""
         key = f"user:{user_id}:is_banned"
-        status = self.client.get(key)
+        status = await self.client.get(key)
         return status == "1"
 
-    def update_ban_status(self, user_id: int, is_banned: bool, db: Session):
+    async def get_moderation_status_bulk(self, user_ids: List[int]) -> Dict[int, Tuple[int, bool]]:
         """
-        유저 차단 상태를 Redis 및 DB에 반영
+        여러 유저의 혐오 표현 감지 횟수 및 차단 여부를 한 번의 MGET 으로 조회
+
+        Returns:
+            {user_id: (경고 횟수, 차단 여부)} - Redis 에 값이 없으면 (0, False)
         """
-        key = f"user:{user_id}:is_banned"
-    
-        if is_banned:
-            self.client.setex(key, 50, "1")  # ⏳ 50초 후 자동 해제
-        else:
-            self.client.delete(key)  # 🚀 차단 해제 시 삭제
-
-        # DB 업데이트
-        user = db.query(Member).filter(Member.id == user_id).first()
-        if user:
-            user.is_blocked = is_banned
-            db.commit()
+        if not user_ids:
+            return {}
+        keys = []
+        for user_id in user_ids:
+            keys += [f"user:{user_id}:hate_count", f"user:{user_id}:is_banned"]
+        values = await self.client.mget(keys)
+        return {
+            user_id: (int(values[2 * i]) if values[2 * i] else 0, values[2 * i + 1] == "1")
+            for i, user_id in enumerate(user_ids)
+        }
+
+
+# 프로세스 전체에서 공유하는 Redis 매니저
+redis_manager = RedisManager()
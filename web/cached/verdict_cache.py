@@ -0,0 +1,108 @@
+import hashlib
+import logging
+import re
+import time
+import unicodedata
+from collections import OrderedDict
+from typing import Dict, Optional
+
+import redis
+
+from config.settings import settings
+from .redis_manager import RedisManager
+
+logger = logging.getLogger(__name__)
+
+_WHITESPACE = re.compile(r"\s+")
+
+
+def normalize_text(text: str) -> str:
+    """캐시 키 생성을 위한 텍스트 정규화 (NFKC, 공백 정리, 소문자)"""
+    text = unicodedata.normalize("NFKC", text)
+    return _WHITESPACE.sub(" ", text).strip().lower()
+
+
+class VerdictCache:
+    """
+    혐오 표현 감지 결과 2단계 캐시
+
+    1단계: 프로세스 내부 LRU (TTL 포함)
+    2단계: Redis (RedisManager)
+    캐시 키에 모델 버전(감지 백엔드의 model_version)이 포함되어
+    백엔드나 모델이 바뀌면 이전 결과는 사용되지 않는다.
+    """
+
+    def __init__(
+        self,
+        redis_manager: RedisManager,
+        model_version: str = settings.classify_model_version,
+        max_size: int = settings.verdict_cache_size,
+        local_ttl: int = settings.verdict_cache_local_ttl,
+        redis_ttl: int = settings.verdict_cache_redis_ttl,
+    ):
+        self.redis = redis_manager
+        self.model_version = model_version
+        self.max_size = max_size
+        self.local_ttl = local_ttl
+        self.redis_ttl = redis_ttl
+
+        self._local: "OrderedDict[str, tuple]" = OrderedDict()
+        self.local_hits = 0
+        self.redis_hits = 0
+        self.misses = 0
+
+    def make_key(self, text: str) -> str:
+        digest = hashlib.sha256(normalize_text(text).encode("utf-8")).hexdigest()
+        return f"{self.model_version}:{digest}"
+
+    async def get(self, text: str) -> Optional[Dict[str, str]]:
+        key = self.make_key(text)
+
+        entry = self._local.get(key)
+        if entry is not None:
+            expires_at, verdict = entry
+            if expires_at > time.monotonic():
+                self._local.move_to_end(key)
+                self.local_hits += 1
+                return verdict
+            del self._local[key]
+
+        try:
+            verdict = await self.redis.get_verdict(key)
+        except redis.RedisError as e:
+            logger.warning("Verdict cache lookup failed: %s", e)
+            verdict = None
+
+        if verdict is not None:
+            self.redis_hits += 1
+            self._store_local(key, verdict)
+            return verdict
+
+        self.misses += 1
+        return None
+
+    async def set(self, text: str, verdict: Dict[str, str]):
+        key = self.make_key(text)
+        self._store_local(key, verdict)
+        try:
+            await self.redis.set_verdict(key, verdict, self.redis_ttl)
+        except redis.RedisError as e:
+            logger.warning("Verdict cache store failed: %s", e)
+
+    def _store_local(self, key: str, verdict: Dict[str, str]):
+        self._local[key] = (time.monotonic() + self.local_ttl, verdict)
+        self._local.move_to_end(key)
+        while len(self._local) > self.max_size:
+            self._local.popitem(last=False)
+
+    def stats(self) -> dict:
+        lookups = self.local_hits + self.redis_hits + self.misses
+        return {
+            "model_version": self.model_version,
+            "size": len(self._local),
+            "max_size": self.max_size,
+            "local_hits": self.local_hits,
+            "redis_hits": self.redis_hits,
+            "misses": self.misses,
+            "hit_ratio": (self.local_hits + self.redis_hits) / lookups if lookups else 0.0,
+        }
@@ -1,15 +1,54 @@
+import logging
 from sqlalchemy import create_engine
+from sqlalchemy.engine import make_url
+from sqlalchemy.exc import SQLAlchemyError
 from sqlalchemy.orm import sessionmaker, declarative_base
 from .settings import settings
 
+logger = logging.getLogger(__name__)
+
+
+def _pool_options(url: str) -> dict:
+    """커넥션 풀 설정 (SQLite 는 풀 크기 옵션을 지원하지 않음)"""
+    if make_url(url).get_backend_name() == "sqlite":
+        return {}
+    return {
+        "pool_size": settings.db_pool_size,
+        "max_overflow": settings.db_max_overflow,
+        "pool_pre_ping": settings.db_pool_pre_ping,
+        "pool_recycle": settings.db_pool_recycle,
+    }
+
+
+def _async_url(url: str) -> str:
+    """동기 DB URL 을 비동기 드라이버 URL 로 변환"""
+    parsed = make_url(url)
+    backend = parsed.get_backend_name()
+    if backend == "postgresql":
+        return parsed.set(drivername="postgresql+asyncpg").render_as_string(hide_password=False)
+    if backend == "sqlite":
+        return parsed.set(drivername="sqlite+aiosqlite").render_as_string(hide_password=False)
+    return url
 
 
 # Database engine
-engine = create_engine(settings.database_url)
+engine = create_engine(settings.database_url, **_pool_options(settings.database_url))
 
 # Database session
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+# Async database engine / session (드라이버가 없으면 None - 동기 세션으로 대체)
+try:
+    from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker
+
+    _async_database_url = settings.async_database_url or _async_url(settings.database_url)
+    async_engine = create_async_engine(_async_database_url, **_pool_options(_async_database_url))
+    AsyncSessionLocal = async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False)
+except (ImportError, SQLAlchemyError) as e:
+    logger.warning("Async database driver is not available, falling back to sync sessions: %s", e)
+    async_engine = None
+    AsyncSessionLocal = None
+
 # SQLAlchemy Base
 Base = declarative_base()
 
@@ -18,4 +57,4 @@ def get_db():
     try:
         yield db  # db 세션을 FastAPI의 Depends로 사용하도록 yield
     finally:
-        db.close()  # 사용 후 세션 종료
\ No newline at end of file
+        db.close()  # 사용 후 세션 종료
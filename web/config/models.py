@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, DateTime, Boolean, ForeignKey, Table, func
+from sqlalchemy import Column, Integer, String, DateTime, Boolean, ForeignKey, Table, Index, func
 from sqlalchemy.orm import relationship
 from datetime import datetime
 from .database import Base
@@ -8,7 +8,8 @@ chat_room_members = Table(
     'chat_room_members',
     Base.metadata,
     Column('chat_room_id', ForeignKey('chat_rooms.id'), primary_key=True),
-    Column('member_id', ForeignKey('members.id'), primary_key=True)
+    Column('member_id', ForeignKey('members.id'), primary_key=True),
+    Column('last_read_at', DateTime, default=datetime.utcnow)  # 안 읽은 메시지 수 계산용 (UTC, Message.timestamp 와 비교)
 )
 
 class Member(Base):
@@ -44,13 +45,19 @@ class Message(Base):
     owner = relationship("Member", back_populates="messages")
     chat_room = relationship("ChatRoom", back_populates="messages")
 
+    # 채팅방 메시지 페이지 조회용 복합 인덱스
+    __table_args__ = (
+        Index("ix_messages_chat_room_id_timestamp_id", "chat_room_id", "timestamp", "id"),
+    )
+
 class ChatRoom(Base):
     __tablename__ = "chat_rooms"
 
     id = Column(Integer, primary_key=True, index=True)
     name = Column(String, unique=True, nullable=False)
-    created_at = Column(DateTime, server_default=func.now())
+    created_at = Column(DateTime, default=datetime.utcnow)  # UTC (Message.timestamp 와 같은 기준)
     created_by = Column(Integer, ForeignKey("members.id"), nullable=False)  # 추가된 필드
+    moderation_mode = Column(String, nullable=True)  # 검열 모드 (blocking / optimistic, 없으면 기본 모드)
 
     # Relationships
     messages = relationship("Message", back_populates="chat_room")
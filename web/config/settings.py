@@ -1,11 +1,142 @@
 from pydantic_settings import BaseSettings
 from pathlib import Path
+from typing import List, Optional
 
 class Settings(BaseSettings):
     database_url: str
+    # 비동기 DB URL (미설정 시 database_url 에서 asyncpg / aiosqlite 드라이버로 변환)
+    async_database_url: Optional[str] = None
     secret_key: str
     algorithm: str
     access_token_expire_minutes: int = 30
+    # 비밀번호 해싱 설정 (rounds 변경 시 로그인하면서 재해싱)
+    password_bcrypt_rounds: int = 12
+    password_hash_workers: int = 4
+    password_hash_max_pending: int = 64
+
+    # 인증 사용자 캐시 (토큰 만료 시각보다 오래 유지되지 않음)
+    principal_cache_ttl: int = 60
+    principal_cache_size: int = 10000
+
+    # Redis 커넥션 풀 설정 (프로세스 전체 공유)
+    redis_host: str = "redis-server"
+    redis_port: int = 6379
+    redis_password: Optional[str] = None
+    redis_db: int = 0
+    redis_max_connections: int = 50
+    redis_pool_timeout: float = 2.0
+    redis_socket_timeout: float = 5.0
+    redis_connect_timeout: float = 2.0
+    redis_health_check_interval: int = 30
+
+    # DB 커넥션 풀 설정
+    db_pool_size: int = 10
+    db_max_overflow: int = 20
+    db_pool_pre_ping: bool = True
+    db_pool_recycle: int = 1800
+
+    # 메시지 write-behind 저장 설정
+    message_flush_interval_ms: int = 50
+    message_flush_rows: int = 500
+    message_id_block_size: int = 200
+    message_buffer_limit: int = 20000
+    message_spill_path: str = "message_spill.jsonl"
+
+    # 혐오 표현 감지 백엔드 (remote: 모델 API / local: 프로세스 내부 ONNX 모델)
+    classifier_backend: str = "remote"
+    classifier_model_path: Optional[str] = None
+    classifier_tokenizer_path: Optional[str] = None  # tokenizer.json
+    classifier_labels: List[str] = ["일반", "혐오"]  # 모델 출력 순서
+    classifier_max_length: int = 128
+    classifier_local_workers: int = 2
+    classifier_local_threads: int = 1
+
+    # 혐오 표현 감지 API 클라이언트 설정
+    classify_api_endpoint: str = "http://proxy-server/model_api/api/inference/classify"
+    classify_http2: bool = False
+    classify_max_connections: int = 100
+    classify_max_keepalive_connections: int = 20
+    classify_keepalive_expiry: float = 30.0
+    classify_connect_timeout: float = 2.0
+    classify_read_timeout: float = 10.0
+    classify_write_timeout: float = 5.0
+    classify_pool_timeout: float = 2.0
+
+    # 모델 추론 전 사전 필터 (사전 파일은 수정 시 자동으로 다시 읽음)
+    prefilter_enabled: bool = True
+    prefilter_lexicon_path: str = str(Path(__file__).resolve().parent.parent / "resources" / "hate_lexicon.txt")
+    prefilter_reload_interval: float = 5.0
+
+    # 혐오 표현 감지 배치 설정
+    classify_batch_size: int = 32
+    classify_batch_wait_ms: float = 5.0
+    classify_max_in_flight: int = 4
+
+    # 혐오 표현 감지 결과 캐시 설정
+    classify_model_version: str = "kcelectra-v1"
+    verdict_cache_size: int = 10000
+    verdict_cache_local_ttl: int = 300
+    verdict_cache_redis_ttl: int = 86400
+
+    # 채팅방 최근 메시지 캐시 설정 (채팅방별 최대 개수 / 메모리 한도 바이트)
+    history_cache_depth: int = 200
+    history_cache_memory_budget: int = 256 * 1024
+    history_cache_ttl: int = 86400
+
+    # 채팅방 멤버 캐시 유지 시간
+    room_members_cache_ttl: int = 3600
+
+    # 차단 설정
+    ban_max_warnings: int = 3
+    ban_seconds: int = 50
+    ban_poll_interval: float = 1.0
+    ban_batch_size: int = 100
+
+    # 채팅방 검열 설정 (blocking / optimistic)
+    moderation_default_mode: str = "blocking"
+    moderation_mode_cache_ttl: int = 86400
+    moderation_workers: int = 4
+    moderation_queue_size: int = 1000
+
+    # 채팅방 브로드캐스트 백엔드 (memory / redis / redis_streams)
+    broadcast_backend: str = "memory"
+    # 별도 Redis 사용 시에만 설정 (미설정 시 공유 Redis 커넥션 풀 사용)
+    broadcast_redis_url: Optional[str] = None
+    broadcast_stream_maxlen: int = 1000
+
+    # 연결별 송신 큐 설정 (overflow: drop_oldest / disconnect)
+    send_queue_size: int = 256
+    send_overflow_policy: str = "drop_oldest"
+
+    # 연결별 수신 큐 (overflow: reject - 과부하 알림 후 버림 / wait - 큐가 빌 때까지 수신 중단)
+    # pipeline_depth 개까지 혐오 표현 감지를 미리 시작하고 처리는 받은 순서대로
+    inbound_queue_size: int = 32
+    inbound_pipeline_depth: int = 4
+    inbound_overflow_policy: str = "reject"
+
+    # 전송 제한 (토큰 버킷: 초당 충전량 / 최대 토큰, action: throttle / drop)
+    # throttle 은 최대 rate_limit_max_delay 초까지 늦춰서 처리하고, 그 이상이면 버림
+    rate_limit_enabled: bool = True
+    rate_limit_action: str = "throttle"
+    rate_limit_max_delay: float = 1.0
+    rate_limit_connection_rate: float = 3.0
+    rate_limit_connection_burst: int = 10
+    rate_limit_user_rate: float = 5.0
+    rate_limit_user_burst: int = 15
+    rate_limit_room_rate: float = 50.0
+    rate_limit_room_burst: int = 100
+    # 로그인 / 회원가입 (클라이언트 IP 기준)
+    rate_limit_login_rate: float = 0.2
+    rate_limit_login_burst: int = 10
+    rate_limit_register_rate: float = 0.05
+    rate_limit_register_burst: int = 5
+
+    # 로깅 설정 (format: text / json)
+    log_level: str = "INFO"
+    log_format: str = "text"
+
+    # 이벤트 루프 지연 측정 주기 (/metrics)
+    metrics_loop_lag_interval: float = 0.5
 
     class Config:
         env_file = Path(__file__).resolve().parent.parent / ".env"
@@ -21,11 +21,14 @@ class ChatRoomRead(BaseModel):
     name:str
     created_at:datetime
     last_message: Optional[str] = None
+    last_message_at: Optional[datetime] = None
+    unread_count: int = 0
 
     class Config:
         from_attributes = True
 
 class CreateChatRoomPayload(BaseModel):
     room_name: str
-    
-    
\ No newline at end of file
+
+class ModerationModePayload(BaseModel):
+    mode: str  # blocking / optimistic
@@ -1,12 +1,57 @@
-from fastapi import FastAPI
+from contextlib import asynccontextmanager
+
+from fastapi import FastAPI, Response
 import uvicorn
 from fastapi.middleware.cors import CORSMiddleware
 
 from router.register.register import register_router 
 from router.user.users import auth_router
-from router.chat_service.chat import chat_router
+from router.chat_service.chat import chat_router, manager, moderation, message_writer, ban_scheduler
+from router.chat_service.classify_text import classifier_backend
+from router.chat_service.classify_batcher import classify_batcher
+from config.database import async_engine, engine
+from cached.redis_manager import redis_manager
+from security.hashing import password_hasher
+from utils.logging_config import configure_logging
+from utils.metrics import instrument_engine, loop_lag_monitor, register_connection_manager, render_latest
+
+configure_logging()
+
+# Prometheus 지표 (채팅방 연결 / 송신 큐는 스크랩 시점에 수집)
+register_connection_manager(manager)
+instrument_engine(engine, "sync")
+if async_engine is not None:
+    instrument_engine(async_engine.sync_engine, "async")
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # 시작: 공유 Redis 커넥션 풀 생성 및 연결 확인
+    await redis_manager.connect()
+    # 시작: 감지 백엔드 (API 커넥션 풀 또는 로컬 모델 프로세스 풀)
+    await classifier_backend.start()
+    # 시작: 채팅방 브로드캐스트 구독 태스크
+    await manager.start()
+    # 시작: 차단 자동 해제 스케줄러
+    ban_scheduler.start()
+    loop_lag_monitor.start()
+    yield
+    # 종료: 남은 검열 작업과 배치 처리 후 커넥션 풀 정리
+    await loop_lag_monitor.stop()
+    await moderation.stop()
+    await ban_scheduler.stop()
+    await manager.stop()
+    # 버퍼에 남은 메시지 저장
+    await message_writer.stop()
+    await classify_batcher.stop()
+    await classifier_backend.close()
+    await redis_manager.close()
+    await password_hasher.shutdown()
+    if async_engine is not None:
+        await async_engine.dispose()
 
-app = FastAPI()
+
+app = FastAPI(lifespan=lifespan)
 
 
 
@@ -16,12 +61,25 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
-    expose_headers=["X-Custom-Header"],
+    expose_headers=["X-Custom-Header", "X-Next-Cursor"],
 )
 
 app.include_router(register_router)
 app.include_router(auth_router)
 app.include_router(chat_router)
 
+
+# Redis 연결 상태 확인
+@app.get("/health")
+async def health():
+    return {"redis": await redis_manager.ping()}
+
+
+# Prometheus 지표 (Grafana 연동)
+@app.get("/metrics", include_in_schema=False)
+def metrics():
+    body, content_type = render_latest()
+    return Response(content=body, media_type=content_type)
+
 if __name__ == "__main__":
     uvicorn.run("main:app", host="0.0.0.0", port=8008, reload=True)
\ No newline at end of file
@@ -0,0 +1,28 @@
+"""messages (chat_room_id, timestamp, id) 복합 인덱스 추가
+
+Revision ID: 0001
+Revises:
+Create Date: 2026-10-18 00:00:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "0001"
+down_revision: Union[str, None] = None
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index(
+        "ix_messages_chat_room_id_timestamp_id",
+        "messages",
+        ["chat_room_id", "timestamp", "id"],
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_messages_chat_room_id_timestamp_id", table_name="messages")
@@ -0,0 +1,31 @@
+"""chat_room_members.last_read_at 컬럼 추가 (안 읽은 메시지 수 계산)
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-18 00:00:00
+
+"""
+from datetime import datetime
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = "0002"
+down_revision: Union[str, None] = "0001"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column("chat_room_members", sa.Column("last_read_at", sa.DateTime(), nullable=True))
+
+    # 기존 멤버는 마이그레이션 시점까지 모두 읽은 것으로 처리
+    # (DB 의 now() 는 서버 시간대를 따르므로 Message.timestamp 와 같은 UTC 값을 직접 넣음)
+    members = sa.table("chat_room_members", sa.column("last_read_at", sa.DateTime()))
+    op.execute(members.update().values(last_read_at=datetime.utcnow()))
+
+
+def downgrade() -> None:
+    op.drop_column("chat_room_members", "last_read_at")
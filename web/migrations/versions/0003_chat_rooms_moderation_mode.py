@@ -0,0 +1,26 @@
+"""chat_rooms.moderation_mode 컬럼 추가 (채팅방 검열 모드 저장)
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-18 00:00:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = "0003"
+down_revision: Union[str, None] = "0002"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # 값이 없으면 설정의 기본 모드 사용 (기존 채팅방은 Redis 에만 있던 모드를 다시 지정해야 함)
+    op.add_column("chat_rooms", sa.Column("moderation_mode", sa.String(), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column("chat_rooms", "moderation_mode")
@@ -1,22 +1,47 @@
+import logging
+import time
+from typing import Optional
+
 from fastapi import APIRouter, WebSocket, WebSocketDisconnect, Depends, HTTPException, status, Query
+from starlette.concurrency import run_in_threadpool
+from starlette.websockets import WebSocketState
 from sqlalchemy.orm import Session
 
-from dto.chat_schemas import MessageCreate, MessageRead, ChatRoomRead, CreateChatRoomPayload
+from dto.chat_schemas import ChatRoomRead, CreateChatRoomPayload, ModerationModePayload
 
 
 from utils.connection_manager import ConnectManager
-from cached.redis_manager import RedisManager
-
-from datetime import datetime
+from utils.broadcast_backend import create_broadcast_backend
+from utils import frame_codec
+from utils.metrics import MESSAGE_STAGE_SECONDS, MODERATION_VERDICTS
+from cached.redis_manager import redis_manager
+from cached.verdict_cache import VerdictCache
+from cached.history_cache import HistoryCache
+from cached.ban_scheduler import BanScheduler
+from cached.membership_cache import RoomMembershipCache
+from cached.moderation_mode_cache import RoomModerationModeCache
+from cached.rate_limiter import rate_limiter
 
 from config.database import get_db
-from config.models import Message, Member, ChatRoom, HateSpeechLog, chat_room_members 
+from config.settings import settings
+from config.models import ChatRoom
 
 from security.auth import *
+from security.principal import Principal
 
 from security.jwt import decode_access_token
 
-from .classify_text import classify_text
+from .classify_batcher import classify_batcher
+from .classify_text import classifier_backend
+from .chat_store import (
+    chat_store, fetch_message_page, fetch_room_list, mark_room_read, add_room_member
+)
+from .inbound import InboundMessage, InboundPipeline
+from .message_writer import MessageWriter
+from .prefilter import Prefilter
+from .moderation import ModerationWorker, ModerationJob, MODERATION_BLOCKING, MODERATION_OPTIMISTIC, MODERATION_MODES
+
+logger = logging.getLogger(__name__)
 
 chat_router = APIRouter(
     prefix="/chat",
@@ -24,18 +49,59 @@ chat_router = APIRouter(
     responses={404: {"description": "Not found"}},
 )
 
-manager = ConnectManager()
-redis = RedisManager()
+manager = ConnectManager(create_broadcast_backend())
+verdict_cache = VerdictCache(redis_manager, classifier_backend.model_version)
+ban_scheduler = BanScheduler(redis_manager, chat_store.unban_members)
+room_members = RoomMembershipCache(redis_manager, chat_store.is_room_member, chat_store.fetch_room_member_ids)
+moderation_modes = RoomModerationModeCache(
+    redis_manager, chat_store.get_room_moderation_mode, chat_store.set_room_moderation_mode
+)
 
 
-# 채팅방 생성
+prefilter = Prefilter()
+
 
+async def classify_message(content: str) -> dict:
+    """사전 필터 -> 캐시 확인 -> 배치 디스패처 순서로 혐오 표현 감지"""
+    if settings.prefilter_enabled:
+        verdict = prefilter.check(content)
+        if verdict is not None:
+            MODERATION_VERDICTS.labels("prefilter", verdict["label"]).inc()
+            return verdict
+    verdict = await verdict_cache.get(content)
+    if verdict is not None:
+        MODERATION_VERDICTS.labels("cache", verdict.get("label", "")).inc()
+        return verdict
+    verdict = await classify_batcher.classify(content)
+    await verdict_cache.set(content, verdict)
+    MODERATION_VERDICTS.labels("model", verdict.get("label", "")).inc()
+    return verdict
+
+
+message_writer = MessageWriter(chat_store)
+history_cache = HistoryCache(redis_manager, has_pending=message_writer.has_pending)
+moderation = ModerationWorker(manager, redis_manager, chat_store, message_writer, history_cache, classify_message)
+
+
+# 혐오 표현 감지 배치 지표 조회
+@chat_router.get("/classifier/metrics")
+def get_classifier_metrics():
+    return {
+        "prefilter": prefilter.stats(),
+        "batcher": classify_batcher.metrics.snapshot(),
+        "verdict_cache": verdict_cache.stats(),
+        "history_cache": {"hits": history_cache.hits, "misses": history_cache.misses},
+        "room_members": room_members.stats(),
+    }
+
+
+# 채팅방 생성
 
 @chat_router.post("/rooms")
 def create_chat_room(
     payload: CreateChatRoomPayload,
     db: Session = Depends(get_db),
-    current_user: Member = Depends(get_current_user)
+    current_user: Principal = Depends(get_current_user)
 ):
     # 중복 이름 확인
     existing_room = db.query(ChatRoom).filter(ChatRoom.name == payload.room_name).first()
@@ -52,8 +118,7 @@ def create_chat_room(
     db.refresh(chat_room)
 
     # 현재 사용자를 채팅방 멤버로 추가
-    chat_room.members.append(current_user)
-    db.commit()
+    add_room_member(db, chat_room.id, current_user.id)
 
     return {
         "id": chat_room.id,
@@ -62,9 +127,11 @@ def create_chat_room(
     }
 
 @chat_router.websocket("/ws/{room_id}")
-async def websocket_endpoint(websocket: WebSocket, room_id: int, token: str, db: Session = Depends(get_db)):
+async def websocket_endpoint(websocket: WebSocket, room_id: int, token: str):
+    connected = False
     try:
-        await websocket.accept()
+        # 프레임 인코딩 협상 (서브프로토콜 msgpack 요청 시 바이너리 프레임)
+        encoding = await frame_codec.accept(websocket)
 
         # JWT 토큰 검증
         payload = decode_access_token(token)
@@ -74,224 +141,248 @@ async def websocket_endpoint(websocket: WebSocket, room_id: int, token: str, db:
             return
 
         username = payload.get("sub")
-        user = db.query(Member).filter(Member.username == username).first()
+        user = await resolve_principal(payload, chat_store.get_member_by_username)
         if not user:
             await websocket.send_json({"error": "User not found"})
             await websocket.close(code=status.WS_1008_POLICY_VIOLATION)
             return
 
         # Redis에서 차단 상태 확인
-        is_banned = redis.check_ban_status(user.id)
+        is_banned = await redis_manager.check_ban_status(user.id)
         if is_banned:
             await websocket.send_json({"error": "User is banned"})
             await websocket.close(code=status.WS_1008_POLICY_VIOLATION)
             return
 
         # 채팅방 존재 여부 확인
-        chat_room = db.query(ChatRoom).filter(ChatRoom.id == room_id).first()
+        chat_room = await chat_store.get_chat_room(room_id)
         if not chat_room:
             await websocket.send_json({"error": "Chat room not found"})
             await websocket.close(code=status.WS_1008_POLICY_VIOLATION)
             return
 
+        # 채팅방 멤버 여부 확인
+        if not await room_members.is_member(room_id, user.id):
+            await websocket.send_json({"error": "User is not a member of this chat room"})
+            await websocket.close(code=status.WS_1008_POLICY_VIOLATION)
+            return
+
+        # 채팅방 검열 모드 (blocking / optimistic)
+        moderation_mode = await moderation_modes.get(room_id)
+
         # WebSocket 매니저에 사용자 등록
-        await manager.connect(websocket, room_id)
-        print(f"User {username} connected to room {room_id}")
+        await manager.connect(websocket, room_id, encoding)
+        connected = True
+        send_bucket = rate_limiter.connection_bucket()
+        logger.info("User %s connected to room %s", username, room_id, extra={"user_id": user.id, "room_id": room_id})
+
+        async def process(inbound: InboundMessage, is_hate: Optional[bool]) -> bool:
+            """감지가 끝난 메시지를 받은 순서대로 저장 및 브로드캐스트 (연결이 종료되면 True)"""
+            content = inbound.content
+            if is_hate:
+                return await moderation.penalize(websocket, user.id, username, room_id, content)
+
+            # 메시지 저장 (write-behind, id 는 미리 할당) 및 브로드캐스트
+            stage_started = time.perf_counter()
+            message = await message_writer.add_message(content, user.id, room_id)
+            persisted_at = time.perf_counter()
+            MESSAGE_STAGE_SECONDS.labels("persist").observe(persisted_at - stage_started)
+
+            # 저장 시간을 ISO 형식으로 추가
+            timestamp = message.timestamp.isoformat()
+
+            # 브로드캐스트 메시지에 시간 추가
+            await manager.broadcast(
+                {
+                    "id": message.id,
+                    "username": username,
+                    "content": content,
+                    "room_id": room_id,
+                    "timestamp": timestamp  # 시간 추가
+                },
+                room_id
+            )
+            broadcast_at = time.perf_counter()
+            MESSAGE_STAGE_SECONDS.labels("broadcast").observe(broadcast_at - persisted_at)
+            MESSAGE_STAGE_SECONDS.labels("total").observe(broadcast_at - inbound.received_at)
+
+            # 최근 메시지 캐시에 추가 (write-through)
+            await history_cache.append(room_id, {
+                "id": message.id,
+                "username": username,
+                "content": content,
+                "timestamp": timestamp,
+            })
+            MESSAGE_STAGE_SECONDS.labels("cache").observe(time.perf_counter() - broadcast_at)
+
+            if moderation_mode == MODERATION_OPTIMISTIC:
+                # 브로드캐스트 후 백그라운드에서 혐오 표현 검사
+                await moderation.submit(ModerationJob(
+                    message_id=message.id,
+                    room_id=room_id,
+                    user_id=user.id,
+                    username=username,
+                    content=content,
+                    websocket=websocket,
+                ))
+            return False
+
+        async def notify(message: dict):
+            await manager.send_personal(websocket, message)
+
+        async def on_error(error: Exception):
+            logger.error("Message handling error in room %s", room_id, exc_info=error, extra={"user_id": user.id, "room_id": room_id})
+            await manager.send_personal(websocket, {"error": "Internal server error"})
+            await manager.close(websocket, code=status.WS_1011_INTERNAL_ERROR)
+
+        # 수신과 처리를 분리 (blocking 모드는 감지를 파이프라인에서 미리 시작)
+        pipeline = InboundPipeline(
+            process,
+            notify,
+            on_error,
+            classify=moderation.is_hate_speech if moderation_mode == MODERATION_BLOCKING else None,
+        )
+        pipeline.start()
 
-        while True:
-            try:
+        try:
+            while True:
                 # 메시지 수신
-                data = await websocket.receive_json()
+                data = await frame_codec.receive_message(websocket, encoding)
+                received_at = time.perf_counter()
                 content = data.get("message")
                 if not content:
-                    await websocket.send_json({"error": "Empty message"})
+                    await manager.send_personal(websocket, {"error": "Empty message"})
                     continue
 
-                # 혐오 표현 필터링
-                classify_result = await classify_text([content])
-                label = classify_result[0]["label"]
-
-                if label == "혐오":
-                    is_banned = redis.increment_hate_count(user.id, db)
-                    warning_count = redis.get_hate_count(user.id)
-
-                    # 🚨 혐오 표현 로그 DB 저장
-                    hate_speech_log = HateSpeechLog(
-                        user_id=user.id,
-                        chat_room_id=room_id,
-                        content=content,
-                        warning_count=warning_count,
-                        username=user.username
-                    )
-    
-                    
-                    
-                    db.add(hate_speech_log)
-                    
-                    
-
-                    # 사용자 경고 횟수 증가 (Member 테이블의 warnings 필드 업데이트)
-                    user.warnings = warning_count  # Member 모델의 warnings 필드 업
-                    db.commit()
-
-                    if is_banned:
-                        # 🚨 해당 사용자에게 차단 알림 (alert)
-                        await websocket.send_json({
-                            "username": "System",
-                            "content": "차단되었습니다. 더 이상 메시지를 보낼 수 없습니다.",
-                            "alert": True,  # 클라이언트에서 alert 처리
-                            "redirect": True
-                        })
-
-                        # ⚠️ 방 전체에 차단 알림 브로드캐스트
-                        await manager.broadcast(
-                            {"username": "System", "content": f"{username}님이 차단되었습니다.", "room_id": room_id},
-                            room_id
-                        )
-
-                        await websocket.close(code=status.WS_1008_POLICY_VIOLATION)
-                        return
-
-                    # 🚨 사용자에게 개별적으로 경고 알림
-                    await websocket.send_json({
-                        "username": "System",
-                        "content": f"경고 {warning_count}/3: 혐오 표현이 감지되었습니다.",
-                        "alert": True  # 클라이언트에서 alert 처리
-                    })
-
-                    # ⚠️ 방 전체에 시스템 메시지로 경고 알림
-                    await manager.broadcast(
-                        {"username": "System", "content": f"{username}님이 경고 {warning_count}/3을 받았습니다.", "room_id": room_id},
-                        room_id
-                    )
+                # 전송 제한 (throttle 이면 대기 후 처리, 초과 시 버림)
+                retry_after = await rate_limiter.acquire_message(send_bucket, user.id, room_id)
+                if retry_after is not None:
+                    await manager.send_personal(websocket, {"error": "Rate limit exceeded", "retry_after": round(retry_after, 3)})
                     continue
 
-                # 메시지 저장 및 브로드캐스트
-                message = Message(content=content, user_id=user.id, chat_room_id=room_id)
-                db.add(message)
-                db.commit()
+                await pipeline.submit(InboundMessage(content, received_at))
 
-                # 현재 시간을 ISO 형식으로 추가
-                timestamp = datetime.utcnow().isoformat()
+        except WebSocketDisconnect:
+            logger.info("User %s disconnected from room %s", username, room_id, extra={"user_id": user.id, "room_id": room_id})
 
-                # 브로드캐스트 메시지에 시간 추가
-                await manager.broadcast(
-                    {
-                        "username": username,
-                        "content": content,
-                        "room_id": room_id,
-                        "timestamp": timestamp  # 시간 추가
-                    },
-                    room_id
-                )
+        except Exception:
+            # 차단 등으로 이미 닫힌 연결
+            if websocket.application_state != WebSocketState.DISCONNECTED:
+                raise
 
-            except WebSocketDisconnect:
-                print(f"User {username} disconnected from room {room_id}")
-                manager.disconnect(websocket, room_id)
-                break
+        finally:
+            # 이미 받은 메시지는 처리 후 종료
+            await pipeline.close()
 
-            except Exception as e:
-                print(f"Message handling error: {e}")
-                await websocket.send_json({"error": "Internal server error"})
-                break
+    except Exception:
+        logger.exception("Critical WebSocket error in room %s", room_id)
+        if websocket.application_state != WebSocketState.DISCONNECTED:
+            await manager.close(websocket, code=status.WS_1011_INTERNAL_ERROR)
 
-    except Exception as e:
-        print(f"Critical WebSocket Error: {e}")
-        await websocket.close(code=status.WS_1011_INTERNAL_ERROR)
+    finally:
+        if connected:
+            await manager.disconnect(websocket, room_id)
+            # 접속 중 실시간으로 받은 메시지는 읽은 것으로 처리
+            try:
+                await chat_store.mark_room_read(room_id, user.id)
+            except Exception:
+                logger.exception("Failed to update read marker for room %s", room_id, extra={"user_id": user.id, "room_id": room_id})
+
+
+# 채팅방 검열 모드 변경
+@chat_router.put("/rooms/{room_id}/moderation")
+async def update_moderation_mode(
+    room_id: int,
+    payload: ModerationModePayload,
+    current_user: Principal = Depends(get_current_user)
+):
+    """
+    채팅방 검열 모드 변경 (채팅방 생성자만 가능)
+    """
+    chat_room = await chat_store.get_chat_room(room_id)
+    if not chat_room:
+        raise HTTPException(status_code=404, detail="Chat room not found")
+
+    if chat_room.created_by != current_user.id:
+        raise HTTPException(status_code=403, detail="Only the room creator can change moderation mode")
+
+    if payload.mode not in MODERATION_MODES:
+        raise HTTPException(status_code=400, detail=f"Moderation mode must be one of {MODERATION_MODES}")
+
+    await moderation_modes.set(room_id, payload.mode)
+    return {"room_id": room_id, "mode": payload.mode}
 
 
 
 # 채팅방 멤버 초대
 @chat_router.post("/rooms/{room_id}/invite")
-def invite_member_to_chat_room(room_id: int, member_id: int, db: Session = Depends(get_db)):
+async def invite_member_to_chat_room(room_id: int, member_id: int):
     """
     채팅방에 멤버 초대
     """
-    chat_room = db.query(ChatRoom).filter(ChatRoom.id == room_id).first()
+    chat_room = await chat_store.get_chat_room(room_id)
     if not chat_room:
         raise HTTPException(status_code=404, detail="Chat room not found")
 
-    member = db.query(Member).filter(Member.id == member_id).first()
+    member = await chat_store.get_member(member_id)
     if not member:
         raise HTTPException(status_code=404, detail="Member not found")
 
-    if member in chat_room.members:
+    if await room_members.is_member(room_id, member_id):
         raise HTTPException(status_code=400, detail="Member is already in the chat room")
 
-    chat_room.members.append(member)
-    db.commit()
+    await chat_store.add_room_member(room_id, member_id)
+    await room_members.added(room_id, member_id)
     return {"message": f"Member {member.username} added to chat room {chat_room.name}"}
 
 # 채팅방 나가기
 @chat_router.post("/rooms/{room_id}/leave")
-def leave_chat_room(room_id: int, member_id: int, db: Session = Depends(get_db)):
+async def leave_chat_room(room_id: int, member_id: int):
     """
     채팅방 나가기
     """
-    chat_room = db.query(ChatRoom).filter(ChatRoom.id == room_id).first()
+    chat_room = await chat_store.get_chat_room(room_id)
     if not chat_room:
         raise HTTPException(status_code=404, detail="Chat room not found")
 
-    member = db.query(Member).filter(Member.id == member_id).first()
+    member = await chat_store.get_member(member_id)
     if not member:
         raise HTTPException(status_code=404, detail="Member not found")
 
-    if member not in chat_room.members:
+    if not await room_members.is_member(room_id, member_id):
         raise HTTPException(status_code=400, detail="Member is not part of the chat room")
 
-    chat_room.members.remove(member)
-    db.commit()
+    await chat_store.remove_room_member(room_id, member_id)
+    await room_members.removed(room_id, member_id)
     return {"message": f"Member {member.username} has left the chat room {chat_room.name}"}
 
 
 # 채팅방 조회
 @chat_router.get("/rooms", response_model=list[ChatRoomRead])
-def get_chat_rooms(db: Session = Depends(get_db), current_user: Member = Depends(get_current_user)):
+def get_chat_rooms(db: Session = Depends(get_db), current_user: Principal = Depends(get_current_user)):
     """
-    사용자가 속한 채팅방 목록을 조회
+    사용자가 속한 채팅방 목록을 최근 활동순으로 조회 (마지막 메시지, 안 읽은 메시지 수 포함)
     """
-    # 사용자가 속한 채팅방만 조회
-    chat_rooms = db.query(ChatRoom).join(chat_room_members).filter(chat_room_members.c.member_id == current_user.id).all()
-
-    response = []
-    for room in chat_rooms:
-        # 마지막 메시지 조회
-        last_message = (
-            db.query(Message.content)
-            .filter(Message.chat_room_id == room.id)
-            .order_by(Message.timestamp.desc())
-            .first()
-        )
-
-        response.append(
-            ChatRoomRead(
-                id=room.id,
-                name=room.name,
-                created_at=room.created_at,
-                last_message=last_message[0] if last_message else None
-            )
-        )
-
-    return response
+    return [ChatRoomRead(**room) for room in fetch_room_list(db, current_user.id)]
 
 
 
 
 # 특정 채팅방에 입장하기 위한 로직 
 @chat_router.post("/rooms/{room_id}/join")
-def join_chat_room(room_id: int, db: Session = Depends(get_db), current_user: Member = Depends(get_current_user)):
+async def join_chat_room(room_id: int, current_user: Principal = Depends(get_current_user)):
     """
     사용자가 특정 채팅방에 입장
     """
-    chat_room = db.query(ChatRoom).filter(ChatRoom.id == room_id).first()
+    chat_room = await chat_store.get_chat_room(room_id)
     if not chat_room:
         raise HTTPException(status_code=404, detail="Chat room not found")
 
-    if current_user in chat_room.members:
+    if await room_members.is_member(room_id, current_user.id):
         return {"message": f"You are already in the chat room {chat_room.name}"}
 
-    chat_room.members.append(current_user)
-    db.commit()
+    await chat_store.add_room_member(room_id, current_user.id)
+    await room_members.added(room_id, current_user.id)
 
     return {"message": f"User {current_user.username} joined chat room {chat_room.name}"}
 
@@ -304,33 +395,34 @@ def join_chat_room(room_id: int, db: Session = Depends(get_db), current_user: Me
 
 
 @chat_router.get("/rooms/{room_id}/messages")
-def get_messages(room_id: int, db: Session = Depends(get_db), current_user: Member = Depends(get_current_user)):
+async def get_messages(
+    room_id: int,
+    before_id: Optional[int] = Query(None, description="이 메시지 이전 페이지"),
+    after_id: Optional[int] = Query(None, description="이 메시지 이후 페이지"),
+    limit: int = Query(50, ge=1, le=200),
+    db: Session = Depends(get_db),
+    current_user: Principal = Depends(get_current_user)
+):
     """
-    채팅방 메시지 조회
+    채팅방 메시지 조회 (커서 기반 페이지네이션)
+
+    커서가 없으면 가장 최근 메시지 limit 개를 시간순으로 반환
     """
-    chat_room = db.query(ChatRoom).filter(ChatRoom.id == room_id).first()
+    if before_id is not None and after_id is not None:
+        raise HTTPException(status_code=400, detail="Use either before_id or after_id, not both")
+
+    chat_room = await chat_store.get_chat_room(room_id)
     if not chat_room:
         raise HTTPException(status_code=404, detail="Chat room not found")
 
-    if current_user not in chat_room.members:
+    if not await room_members.is_member(room_id, current_user.id):
         raise HTTPException(status_code=403, detail="User is not a member of this chat room")
 
-    messages = (
-        db.query(Message)
-        .filter(Message.chat_room_id == room_id)
-        .order_by(Message.timestamp.asc())
-        .all()
-    )
+    # 최신 페이지는 Redis 캐시에서, 이전/이후 페이지는 DB 에서 조회 (DB 조회는 스레드풀에서 실행)
+    if before_id is None and after_id is None:
+        await run_in_threadpool(mark_room_read, db, room_id, current_user.id)
+        return await history_cache.get_latest(
+            room_id, limit, lambda count: run_in_threadpool(fetch_message_page, db, room_id, count)
+        )
 
-    # 디버깅 로그
-    print(f"🔍 쿼리된 메시지: {[message.content for message in messages]}")
-
-    return [
-        {
-            "id": message.id,
-            "username": db.query(Member.username).filter(Member.id == message.user_id).scalar(),
-            "content": message.content,
-            "timestamp": message.timestamp.isoformat(),
-        }
-        for message in messages
-    ]
+    return await run_in_threadpool(fetch_message_page, db, room_id, limit, before_id=before_id, after_id=after_id)
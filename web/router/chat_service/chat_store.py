@@ -0,0 +1,330 @@
+import logging
+from typing import Callable, List, Optional, Tuple, TypeVar
+
+from datetime import datetime
+
+from sqlalchemy import and_, delete, func, insert, select, text, tuple_, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session, aliased, sessionmaker
+from starlette.concurrency import run_in_threadpool
+
+from config.database import AsyncSessionLocal, engine
+from config.models import ChatRoom, Member, Message, chat_room_members
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+
+# DB 작업 (동기 Session 기준으로 작성, 비동기 저장소에서는 run_sync 로 실행)
+
+def get_member_by_username(db: Session, username: str) -> Optional[Member]:
+    """username 으로 사용자 조회 (로그인 / 토큰 검증 / WebSocket 인증 공용)"""
+    return db.query(Member).filter(Member.username == username).first()
+
+
+def _get_member(db: Session, member_id: int) -> Optional[Member]:
+    return db.query(Member).filter(Member.id == member_id).first()
+
+
+def _get_chat_room(db: Session, room_id: int) -> Optional[ChatRoom]:
+    return db.query(ChatRoom).filter(ChatRoom.id == room_id).first()
+
+
+def fetch_message_page(
+    db: Session,
+    room_id: int,
+    limit: int,
+    before_id: Optional[int] = None,
+    after_id: Optional[int] = None,
+) -> List[dict]:
+    """
+    채팅방 메시지 keyset 페이지 조회 (작성자 이름 join, 시간순 정렬)
+
+    (chat_room_id, timestamp, id) 복합 인덱스를 그대로 사용하도록
+    (timestamp, id) 튜플 비교로 커서 이전/이후 메시지를 가져온다.
+    """
+    query = (
+        select(Message.id, Member.username, Message.content, Message.timestamp)
+        .join(Member, Member.id == Message.user_id)
+        .where(Message.chat_room_id == room_id, Message.is_hate_speech.isnot(True))  # 회수된 메시지 제외
+    )
+    key = tuple_(Message.timestamp, Message.id)
+
+    if after_id is not None:
+        anchor = select(Message.timestamp).where(Message.id == after_id).scalar_subquery()
+        query = query.where(key > tuple_(anchor, after_id)).order_by(Message.timestamp.asc(), Message.id.asc())
+        rows = db.execute(query.limit(limit)).all()
+    else:
+        if before_id is not None:
+            anchor = select(Message.timestamp).where(Message.id == before_id).scalar_subquery()
+            query = query.where(key < tuple_(anchor, before_id))
+        query = query.order_by(Message.timestamp.desc(), Message.id.desc())
+        rows = list(reversed(db.execute(query.limit(limit)).all()))
+
+    return [
+        {
+            "id": row.id,
+            "username": row.username,
+            "content": row.content,
+            "timestamp": row.timestamp.isoformat(),
+        }
+        for row in rows
+    ]
+
+
+def fetch_room_list(db: Session, member_id: int) -> List[dict]:
+    """
+    사용자가 속한 채팅방 목록 (마지막 메시지, 안 읽은 메시지 수 포함) 단일 쿼리 조회
+
+    마지막 메시지/안 읽은 수는 채팅방별 상관 서브쿼리로 계산되어
+    (chat_room_id, timestamp, id) 인덱스 탐색 한 번씩으로 처리된다.
+    """
+    visible = and_(Message.chat_room_id == ChatRoom.id, Message.is_hate_speech.isnot(True))
+
+    latest = (
+        select(Message.id)
+        .where(visible)
+        .order_by(Message.timestamp.desc(), Message.id.desc())
+        .limit(1)
+        .correlate(ChatRoom)
+        .scalar_subquery()
+    )
+    unread = (
+        select(func.count())
+        .select_from(Message)
+        .where(
+            visible,
+            Message.user_id != member_id,
+            Message.timestamp > func.coalesce(chat_room_members.c.last_read_at, ChatRoom.created_at),
+        )
+        .correlate(ChatRoom, chat_room_members)
+        .scalar_subquery()
+    )
+    last_message = aliased(Message)
+    last_activity = func.coalesce(last_message.timestamp, ChatRoom.created_at)
+
+    query = (
+        select(
+            ChatRoom.id,
+            ChatRoom.name,
+            ChatRoom.created_at,
+            last_message.content.label("last_message"),
+            last_message.timestamp.label("last_message_at"),
+            unread.label("unread_count"),
+        )
+        .join(chat_room_members, chat_room_members.c.chat_room_id == ChatRoom.id)
+        .outerjoin(last_message, last_message.id == latest)
+        .where(chat_room_members.c.member_id == member_id)
+        .order_by(last_activity.desc(), ChatRoom.id.desc())
+    )
+    return [dict(row._mapping) for row in db.execute(query)]
+
+
+def mark_room_read(db: Session, room_id: int, member_id: int):
+    """채팅방 읽음 시점 갱신"""
+    db.execute(
+        update(chat_room_members)
+        .where(chat_room_members.c.chat_room_id == room_id, chat_room_members.c.member_id == member_id)
+        .values(last_read_at=datetime.utcnow())
+    )
+    db.commit()
+
+
+def is_room_member(db: Session, room_id: int, member_id: int) -> bool:
+    """채팅방 멤버 여부 (chat_room_members 기본키 조회)"""
+    query = select(chat_room_members.c.member_id).where(
+        chat_room_members.c.chat_room_id == room_id, chat_room_members.c.member_id == member_id
+    )
+    return db.execute(query.limit(1)).first() is not None
+
+
+def add_room_member(db: Session, room_id: int, member_id: int):
+    """채팅방 멤버 추가"""
+    db.execute(insert(chat_room_members).values(chat_room_id=room_id, member_id=member_id))
+    db.commit()
+
+
+def remove_room_member(db: Session, room_id: int, member_id: int):
+    """채팅방 멤버 제거"""
+    db.execute(
+        delete(chat_room_members)
+        .where(chat_room_members.c.chat_room_id == room_id, chat_room_members.c.member_id == member_id)
+    )
+    db.commit()
+
+
+def fetch_room_member_ids(db: Session, room_id: int) -> List[int]:
+    """채팅방 멤버 id 목록 (ORM 객체를 만들지 않고 기본키만 조회)"""
+    query = select(chat_room_members.c.member_id).where(chat_room_members.c.chat_room_id == room_id)
+    return list(db.execute(query).scalars())
+
+
+def _mark_hate_speech(db: Session, message_id: int):
+    db.query(Message).filter(Message.id == message_id).update({"is_hate_speech": True})
+    db.commit()
+
+
+def _reserve_ids(db: Session, model: type, count: int, after: int) -> List[int]:
+    """id 미리 할당 (PostgreSQL 은 시퀀스, 그 외에는 현재 최대 id 이후)"""
+    if db.get_bind().dialect.name == "postgresql":
+        rows = db.execute(
+            text("SELECT nextval(pg_get_serial_sequence(:table, 'id')) FROM generate_series(1, :count)"),
+            {"table": model.__tablename__, "count": count},
+        )
+        return [row[0] for row in rows]
+
+    # 시퀀스가 없는 DB (SQLite 등) - 단일 프로세스에서만 안전
+    start = max(db.query(func.coalesce(func.max(model.id), 0)).scalar(), after) + 1
+    return list(range(start, start + count))
+
+
+def _insert_batch(db: Session, runs: List[Tuple[type, List[dict]]]):
+    """
+    (모델, 행 목록) 묶음들을 순서대로 한 트랜잭션에서 대량 insert
+
+    일부만 저장된 상태로 남지 않으므로 실패한 배치는 통째로 다시 시도하면 된다.
+    실패 시 이전 시도에서 이미 저장된 행(미리 할당한 id 가 이미 있음)만 건너뛰고 한 행씩 다시 저장하며,
+    그 외 이유(외래 키, NOT NULL 등)로 저장할 수 없는 행은 로그를 남기고 버린다.
+    """
+    try:
+        for model, rows in runs:
+            db.execute(insert(model), rows)
+        db.commit()
+        return
+    except IntegrityError:
+        db.rollback()
+
+    for model, rows in runs:
+        ids = [row["id"] for row in rows if row.get("id") is not None]
+        saved = set(db.execute(select(model.id).where(model.id.in_(ids))).scalars()) if ids else set()
+        for row in rows:
+            if row.get("id") in saved:
+                continue
+            try:
+                with db.begin_nested():
+                    db.execute(insert(model), [row])
+            except IntegrityError as e:
+                logger.error("Dropped %s row that cannot be saved: %s (%s)", model.__tablename__, row, e.orig)
+    db.commit()
+
+
+def _get_room_moderation_mode(db: Session, room_id: int) -> Optional[str]:
+    return db.execute(select(ChatRoom.moderation_mode).where(ChatRoom.id == room_id)).scalar()
+
+
+def _set_room_moderation_mode(db: Session, room_id: int, mode: str):
+    db.execute(update(ChatRoom).where(ChatRoom.id == room_id).values(moderation_mode=mode))
+    db.commit()
+
+
+def _update_member_moderation(db: Session, user_id: int, warning_count: int, is_banned: bool):
+    # 사용자 경고 횟수 및 차단 여부 업데이트
+    values = {"warnings": warning_count}
+    if is_banned:
+        values["is_blocked"] = True
+    db.query(Member).filter(Member.id == user_id).update(values)
+    db.commit()
+
+
+def _unban_members(db: Session, user_ids: List[int]):
+    # 차단 기간이 지난 사용자 일괄 해제 (이미 해제된 사용자는 그대로)
+    db.execute(
+        update(Member)
+        .where(Member.id.in_(user_ids), Member.is_blocked.is_(True))
+        .values(is_blocked=False)
+    )
+    db.commit()
+
+
+class ChatStore:
+    """
+    WebSocket 경로에서 사용하는 채팅 데이터 접근 계층
+
+    작업마다 짧은 세션을 열고 닫아, 연결이 유지되는 동안
+    DB 커넥션을 점유하지 않는다.
+    """
+
+    async def run(self, operation: Callable[..., T], *args) -> T:
+        raise NotImplementedError
+
+    async def get_member_by_username(self, username: str) -> Optional[Member]:
+        return await self.run(get_member_by_username, username)
+
+    async def get_member(self, member_id: int) -> Optional[Member]:
+        return await self.run(_get_member, member_id)
+
+    async def get_chat_room(self, room_id: int) -> Optional[ChatRoom]:
+        return await self.run(_get_chat_room, room_id)
+
+    async def is_room_member(self, room_id: int, member_id: int) -> bool:
+        return await self.run(is_room_member, room_id, member_id)
+
+    async def fetch_room_member_ids(self, room_id: int) -> List[int]:
+        return await self.run(fetch_room_member_ids, room_id)
+
+    async def add_room_member(self, room_id: int, member_id: int):
+        await self.run(add_room_member, room_id, member_id)
+
+    async def remove_room_member(self, room_id: int, member_id: int):
+        await self.run(remove_room_member, room_id, member_id)
+
+    async def get_room_moderation_mode(self, room_id: int) -> Optional[str]:
+        return await self.run(_get_room_moderation_mode, room_id)
+
+    async def set_room_moderation_mode(self, room_id: int, mode: str):
+        await self.run(_set_room_moderation_mode, room_id, mode)
+
+    async def mark_room_read(self, room_id: int, member_id: int):
+        await self.run(mark_room_read, room_id, member_id)
+
+    async def mark_hate_speech(self, message_id: int):
+        await self.run(_mark_hate_speech, message_id)
+
+    async def reserve_ids(self, model: type, count: int, after: int = 0) -> List[int]:
+        return await self.run(_reserve_ids, model, count, after)
+
+    async def insert_batch(self, runs: List[Tuple[type, List[dict]]]):
+        await self.run(_insert_batch, runs)
+
+    async def update_member_moderation(self, user_id: int, warning_count: int, is_banned: bool):
+        await self.run(_update_member_moderation, user_id, warning_count, is_banned)
+
+    async def unban_members(self, user_ids: List[int]):
+        await self.run(_unban_members, user_ids)
+
+
+class AsyncChatStore(ChatStore):
+    """비동기 엔진 (asyncpg / aiosqlite) 사용 - 이벤트 루프를 막지 않음"""
+
+    def __init__(self, session_factory=AsyncSessionLocal):
+        self.session_factory = session_factory
+
+    async def run(self, operation: Callable[..., T], *args) -> T:
+        async with self.session_factory() as session:
+            return await session.run_sync(operation, *args)
+
+
+class SyncChatStore(ChatStore):
+    """비동기 드라이버가 없을 때 동기 세션을 스레드풀에서 실행"""
+
+    def __init__(self, session_factory=None):
+        self.session_factory = session_factory or sessionmaker(
+            bind=engine, autoflush=False, expire_on_commit=False
+        )
+
+    def _run(self, operation: Callable[..., T], *args) -> T:
+        with self.session_factory() as session:
+            return operation(session, *args)
+
+    async def run(self, operation: Callable[..., T], *args) -> T:
+        return await run_in_threadpool(self._run, operation, *args)
+
+
+def create_chat_store() -> ChatStore:
+    if AsyncSessionLocal is not None:
+        return AsyncChatStore()
+    return SyncChatStore()
+
+
+chat_store = create_chat_store()
@@ -0,0 +1,176 @@
+import asyncio
+from collections import Counter
+from typing import Awaitable, Callable, Dict, List, Optional, Tuple
+
+from config.settings import settings
+from utils.metrics import CLASSIFY_BATCH_SIZE, CLASSIFY_QUEUE_WAIT_SECONDS
+
+from .classify_text import classify_text
+
+ClassifyFn = Callable[[List[str]], Awaitable[List[Dict[str, str]]]]
+
+
+class BatchMetrics:
+    """배치 크기 분포 및 큐 대기 시간 지표"""
+
+    def __init__(self):
+        self.batch_sizes: Counter = Counter()  # 배치 크기 -> 발생 횟수
+        self.batches = 0
+        self.items = 0
+        self.errors = 0
+        self.queue_wait_total = 0.0
+        self.queue_wait_max = 0.0
+
+    def observe_batch(self, size: int, waits: List[float]):
+        self.batch_sizes[size] += 1
+        self.batches += 1
+        self.items += size
+        self.queue_wait_total += sum(waits)
+        self.queue_wait_max = max(self.queue_wait_max, *waits)
+        CLASSIFY_BATCH_SIZE.observe(size)
+        for wait in waits:
+            CLASSIFY_QUEUE_WAIT_SECONDS.observe(wait)
+
+    def snapshot(self) -> dict:
+        return {
+            "batches": self.batches,
+            "items": self.items,
+            "errors": self.errors,
+            "avg_batch_size": self.items / self.batches if self.batches else 0.0,
+            "batch_size_distribution": dict(sorted(self.batch_sizes.items())),
+            "avg_queue_wait_ms": self.queue_wait_total / self.items * 1000 if self.items else 0.0,
+            "max_queue_wait_ms": self.queue_wait_max * 1000,
+        }
+
+
+class ClassifyBatcher:
+    """
+    여러 WebSocket 연결의 혐오 표현 감지 요청을 모아 한 번에 API 호출
+
+    max_wait_ms 동안 또는 max_batch_size 개가 모일 때까지 기다린 뒤
+    classify_text 를 한 번 호출하고, 결과를 각 요청 코루틴에 돌려준다.
+    """
+
+    def __init__(
+        self,
+        classify_fn: ClassifyFn = classify_text,
+        max_batch_size: int = 32,
+        max_wait_ms: float = 5.0,
+        max_in_flight: int = 4,
+    ):
+        self.classify_fn = classify_fn
+        self.max_batch_size = max_batch_size
+        self.max_wait_ms = max_wait_ms
+        self.max_in_flight = max_in_flight
+        self.metrics = BatchMetrics()
+
+        self._queue: Optional[asyncio.Queue] = None
+        self._in_flight: Optional[asyncio.Semaphore] = None
+        self._worker: Optional[asyncio.Task] = None
+        self._dispatches: set = set()
+
+    def start(self):
+        """배치 워커 시작 (실행 중인 이벤트 루프 필요)"""
+        if self._worker is not None and not self._worker.done():
+            return
+        self._queue = asyncio.Queue()
+        self._in_flight = asyncio.Semaphore(self.max_in_flight)
+        self._worker = asyncio.create_task(self._run())
+
+    async def stop(self):
+        """배치 워커 종료 - 진행 중인 요청은 끝까지 처리"""
+        if self._worker is None:
+            return
+        self._worker.cancel()
+        try:
+            await self._worker
+        except asyncio.CancelledError:
+            pass
+        self._worker = None
+        if self._dispatches:
+            await asyncio.gather(*self._dispatches, return_exceptions=True)
+
+        # 아직 큐에 남은 요청은 실패 처리
+        while not self._queue.empty():
+            _, future, _ = self._queue.get_nowait()
+            if not future.done():
+                future.set_exception(RuntimeError("Classifier batcher stopped"))
+
+    async def classify(self, text: str) -> Dict[str, str]:
+        """
+        단일 텍스트 감지 요청
+
+        Args:
+            text (str): 감지할 텍스트
+
+        Returns:
+            Dict[str, str]: 감지 결과 (label과 score 포함)
+        """
+        self.start()
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        await self._queue.put((text, future, loop.time()))
+        return await future
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await self._queue.get()]
+            deadline = loop.time() + self.max_wait_ms / 1000
+
+            while len(batch) < self.max_batch_size:
+                # 이미 큐에 쌓인 요청은 기다리지 않고 바로 가져옴
+                if not self._queue.empty():
+                    batch.append(self._queue.get_nowait())
+                    continue
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self._queue.get(), timeout))
+                except asyncio.TimeoutError:
+                    break
+
+            # 동시에 진행 중인 API 요청 수 제한
+            await self._in_flight.acquire()
+            task = asyncio.create_task(self._dispatch(batch))
+            self._dispatches.add(task)
+            task.add_done_callback(self._dispatches.discard)
+
+    async def _dispatch(self, batch: List[Tuple[str, asyncio.Future, float]]):
+        loop = asyncio.get_running_loop()
+        try:
+            # 대기 중 취소된 요청은 제외
+            batch = [item for item in batch if not item[1].done()]
+            if not batch:
+                return
+
+            now = loop.time()
+            self.metrics.observe_batch(len(batch), [now - enqueued_at for _, _, enqueued_at in batch])
+
+            try:
+                results = await self.classify_fn([text for text, _, _ in batch])
+                if len(results) != len(batch):
+                    raise RuntimeError(
+                        f"Classifier returned {len(results)} results for {len(batch)} texts"
+                    )
+            except Exception as e:
+                self.metrics.errors += 1
+                for _, future, _ in batch:
+                    if not future.done():
+                        future.set_exception(e)
+                return
+
+            for (_, future, _), result in zip(batch, results):
+                if not future.done():
+                    future.set_result(result)
+        finally:
+            self._in_flight.release()
+
+
+# 모든 연결이 공유하는 배치 디스패처
+classify_batcher = ClassifyBatcher(
+    max_batch_size=settings.classify_batch_size,
+    max_wait_ms=settings.classify_batch_wait_ms,
+    max_in_flight=settings.classify_max_in_flight,
+)
@@ -1,15 +1,121 @@
+import hashlib
+import logging
 import httpx
-from typing import List, Dict
+from typing import List, Dict, Optional
 from fastapi import HTTPException
-import asyncio
+
+from config.settings import settings
+
+logger = logging.getLogger(__name__)
 
 # 혐오 표현 감지 API URL
-CLASSIFY_API_ENDPOINT = "http://proxy-server/model_api/api/inference/classify"
+CLASSIFY_API_ENDPOINT = settings.classify_api_endpoint
+
+
+def model_version_tag(backend: str, *parts: object) -> str:
+    """감지 결과 캐시 키용 모델 버전 (설정 버전-백엔드-모델 식별값 해시)"""
+    digest = hashlib.sha1("\0".join(str(part) for part in parts).encode("utf-8")).hexdigest()[:10]
+    return f"{settings.classify_model_version}-{backend}-{digest}"
+
+
+class ClassifierBackend:
+    """
+    혐오 표현 감지 백엔드 인터페이스
+
+    classify 는 입력 순서대로 {"label": ..., "score": ...} 리스트를 반환한다.
+    model_version 은 감지 결과 캐시 키에 사용되어 백엔드/모델이 바뀌면 이전 결과를 쓰지 않는다.
+    """
+
+    @property
+    def model_version(self) -> str:
+        return settings.classify_model_version
+
+    async def start(self):
+        pass
+
+    async def close(self):
+        pass
+
+    async def classify(self, texts: List[str]) -> List[Dict[str, str]]:
+        raise NotImplementedError
+
+
+class ClassifierClient(ClassifierBackend):
+    """
+    혐오 표현 감지 API 용 공유 HTTP 클라이언트 (원격 백엔드)
+
+    앱 lifespan 동안 keep-alive 커넥션 풀을 유지하여
+    메시지마다 TCP/TLS 연결을 새로 맺지 않도록 한다.
+    """
+
+    def __init__(self, endpoint: str = CLASSIFY_API_ENDPOINT):
+        self.endpoint = endpoint
+        self._client: Optional[httpx.AsyncClient] = None
+
+    @property
+    def model_version(self) -> str:
+        return model_version_tag("remote", self.endpoint)
+
+    def _build_client(self) -> httpx.AsyncClient:
+        http2 = settings.classify_http2
+        if http2:
+            try:
+                import h2  # noqa: F401  HTTP/2 사용 시 필요한 패키지
+            except ImportError:
+                logger.warning("h2 package is not installed, falling back to HTTP/1.1")
+                http2 = False
+
+        return httpx.AsyncClient(
+            http2=http2,
+            limits=httpx.Limits(
+                max_connections=settings.classify_max_connections,
+                max_keepalive_connections=settings.classify_max_keepalive_connections,
+                keepalive_expiry=settings.classify_keepalive_expiry,
+            ),
+            timeout=httpx.Timeout(
+                connect=settings.classify_connect_timeout,
+                read=settings.classify_read_timeout,
+                write=settings.classify_write_timeout,
+                pool=settings.classify_pool_timeout,
+            ),
+        )
+
+    async def start(self):
+        """커넥션 풀 생성"""
+        if self._client is None:
+            self._client = self._build_client()
+
+    async def close(self):
+        """커넥션 풀 종료"""
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+    async def classify(self, texts: List[str]) -> List[Dict[str, str]]:
+        if self._client is None:
+            await self.start()
+        response = await self._client.post(self.endpoint, json={"texts": texts})
+        response.raise_for_status()
+        return response.json()
+
+
+def create_classifier_backend(backend: str = settings.classifier_backend) -> ClassifierBackend:
+    """설정값에 따라 감지 백엔드 생성 (remote / local)"""
+    if backend == "remote":
+        return ClassifierClient()
+    if backend == "local":
+        from .local_classifier import LocalClassifier
+        return LocalClassifier()
+    raise ValueError(f"Unknown classifier backend: {backend}")
+
+
+# 앱 전체에서 공유하는 감지 백엔드 (main.py lifespan 에서 시작/종료)
+classifier_backend = create_classifier_backend()
 
 
 async def classify_text(texts: List[str]) -> List[Dict[str, str]]:
     """
-    혐오 표현 감지 API 호출
+    혐오 표현 감지 (설정된 백엔드 사용)
 
     Args:
         texts (List[str]): 감지할 텍스트 리스트
@@ -18,11 +124,6 @@ async def classify_text(texts: List[str]) -> List[Dict[str, str]]:
         List[Dict[str, str]]: 감지 결과 (label과 score 포함)
     """
     try:
-        payload = {"texts": texts}
-        async with httpx.AsyncClient() as client:
-            response = await client.post(CLASSIFY_API_ENDPOINT, json=payload, timeout=10)
-            response.raise_for_status()
-        return response.json()
+        return await classifier_backend.classify(texts)
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error during classification: {str(e)}")
-
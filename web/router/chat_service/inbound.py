@@ -0,0 +1,151 @@
+import asyncio
+import logging
+import time
+from collections import deque
+from dataclasses import dataclass
+from typing import Awaitable, Callable, Deque, Optional, Tuple
+
+from config.settings import settings
+from utils.metrics import INBOUND_REJECTED, MESSAGE_STAGE_SECONDS
+
+logger = logging.getLogger(__name__)
+
+# 수신 큐가 가득 찼을 때 정책
+INBOUND_REJECT = "reject"  # 과부하 알림 후 메시지 버림
+INBOUND_WAIT = "wait"      # 큐에 자리가 날 때까지 수신 중단 (TCP 흐름 제어로 전달)
+
+
+@dataclass
+class InboundMessage:
+    """수신한 채팅 메시지"""
+    content: str
+    received_at: float  # time.perf_counter()
+
+
+class InboundPipeline:
+    """
+    연결별 수신 메시지 처리 파이프라인
+
+    - 수신 루프는 프레임을 읽어 bounded 큐에 넣기만 하고, 처리는 연결별 워커가 담당
+    - 워커는 큐에 쌓인 메시지 depth 개까지 혐오 표현 감지를 미리 시작 (배치 디스패처에서 함께 처리)
+      하고, 저장/브로드캐스트는 받은 순서대로 실행
+    - 큐가 3/4 이상 차면 {"type": "backpressure", "paused": true}, 1/4 이하로 비면 paused false 알림
+    - process 가 True 를 반환하면 (차단 등으로 연결 종료) 남은 메시지는 버리고 워커 종료
+    """
+
+    def __init__(
+        self,
+        process: Callable[[InboundMessage, Optional[bool]], Awaitable[bool]],
+        notify: Callable[[dict], Awaitable[None]],
+        on_error: Callable[[Exception], Awaitable[None]],
+        classify: Optional[Callable[[str], Awaitable[bool]]] = None,
+        max_queue_size: int = settings.inbound_queue_size,
+        depth: int = settings.inbound_pipeline_depth,
+        overflow_policy: str = settings.inbound_overflow_policy,
+    ):
+        self.process = process
+        self.notify = notify
+        self.on_error = on_error
+        self.classify = classify
+        self.depth = max(1, depth)
+        self.overflow_policy = overflow_policy
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=max_queue_size)
+        self.high_watermark = max(1, max_queue_size * 3 // 4)
+        self.low_watermark = max_queue_size // 4
+        self.paused = False
+        self.closed = False
+        self._worker: Optional[asyncio.Task] = None
+
+    def start(self):
+        if self._worker is None:
+            self._worker = asyncio.create_task(self._run())
+
+    async def submit(self, message: InboundMessage) -> bool:
+        """
+        처리할 메시지 추가
+
+        Returns:
+            bool: 큐에 추가 여부 (과부하로 버렸거나 워커가 종료된 경우 False)
+        """
+        if self.closed:
+            return False
+
+        if self.queue.full():
+            if self.overflow_policy == INBOUND_REJECT:
+                INBOUND_REJECTED.inc()
+                await self.notify({"type": "overloaded", "error": "Server is busy", "pending": self.queue.qsize()})
+                return False
+            # 자리가 날 때까지 대기 (그동안 워커가 종료되면 포기)
+            put = asyncio.ensure_future(self.queue.put(message))
+            await asyncio.wait({put, self._worker}, return_when=asyncio.FIRST_COMPLETED)
+            if not put.done():
+                put.cancel()
+                return False
+        else:
+            self.queue.put_nowait(message)
+
+        await self._update_backpressure()
+        return True
+
+    async def close(self):
+        """수신 종료 - 큐에 남은 메시지까지 처리한 뒤 워커 종료"""
+        self.closed = True
+        if self._worker is None or self._worker.done():
+            return
+        stop = asyncio.ensure_future(self.queue.put(None))
+        try:
+            await self._worker
+        finally:
+            stop.cancel()
+
+    async def _update_backpressure(self):
+        depth = self.queue.qsize()
+        if not self.paused and depth >= self.high_watermark:
+            self.paused = True
+            await self.notify({"type": "backpressure", "paused": True, "pending": depth})
+        elif self.paused and depth <= self.low_watermark:
+            self.paused = False
+            await self.notify({"type": "backpressure", "paused": False, "pending": depth})
+
+    def _start(self, message: InboundMessage) -> Tuple[InboundMessage, Optional[asyncio.Future]]:
+        MESSAGE_STAGE_SECONDS.labels("queue").observe(time.perf_counter() - message.received_at)
+        if self.classify is None:
+            return message, None
+        return message, asyncio.ensure_future(self._classify(message.content))
+
+    async def _classify(self, content: str) -> bool:
+        started = time.perf_counter()
+        try:
+            return await self.classify(content)
+        finally:
+            MESSAGE_STAGE_SECONDS.labels("classify").observe(time.perf_counter() - started)
+
+    async def _run(self):
+        in_flight: Deque[Tuple[InboundMessage, Optional[asyncio.Future]]] = deque()
+        draining = False
+        try:
+            while True:
+                # 처리 중인 메시지가 없을 때만 대기, 이미 쌓인 메시지는 감지를 미리 시작
+                while not draining and len(in_flight) < self.depth and (not in_flight or not self.queue.empty()):
+                    message = await self.queue.get()
+                    if message is None:
+                        draining = True
+                    else:
+                        in_flight.append(self._start(message))
+                if not in_flight:
+                    return
+                await self._update_backpressure()
+
+                message, verdict = in_flight.popleft()
+                is_hate = await verdict if verdict is not None else None
+                if await self.process(message, is_hate):
+                    return
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            await self.on_error(e)
+        finally:
+            self.closed = True
+            for _, verdict in in_flight:
+                if verdict is not None:
+                    verdict.cancel()
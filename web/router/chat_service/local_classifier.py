@@ -0,0 +1,131 @@
+import asyncio
+import logging
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Optional
+
+from config.settings import settings
+
+from .classify_text import ClassifierBackend, model_version_tag
+
+logger = logging.getLogger(__name__)
+
+# 워커 프로세스별로 한 번만 로드되는 모델 / 토크나이저
+_session = None
+_tokenizer = None
+_input_names: List[str] = []
+_labels: List[str] = []
+
+
+def _init_worker(model_path: str, tokenizer_path: str, labels: List[str], max_length: int, threads: int):
+    """워커 프로세스 초기화 - ONNX 모델 및 토크나이저 로드"""
+    global _session, _tokenizer, _input_names, _labels
+
+    import onnxruntime
+    from tokenizers import Tokenizer
+
+    options = onnxruntime.SessionOptions()
+    options.intra_op_num_threads = threads
+    options.inter_op_num_threads = 1
+    _session = onnxruntime.InferenceSession(model_path, options, providers=["CPUExecutionProvider"])
+    _input_names = [model_input.name for model_input in _session.get_inputs()]
+
+    _tokenizer = Tokenizer.from_file(tokenizer_path)
+    pad_id = _tokenizer.token_to_id("[PAD]") or 0
+    _tokenizer.enable_padding(pad_id=pad_id, pad_token="[PAD]")
+    _tokenizer.enable_truncation(max_length=max_length)
+    _labels = labels
+
+
+def _predict(texts: List[str]) -> List[Dict[str, object]]:
+    """배치 추론 - 원격 API 와 같은 {label, score} 형식으로 반환"""
+    import numpy as np
+
+    encodings = _tokenizer.encode_batch(texts)
+    features = {
+        "input_ids": np.array([e.ids for e in encodings], dtype=np.int64),
+        "attention_mask": np.array([e.attention_mask for e in encodings], dtype=np.int64),
+        "token_type_ids": np.array([e.type_ids for e in encodings], dtype=np.int64),
+    }
+    logits = _session.run(None, {name: features[name] for name in _input_names})[0]
+
+    # softmax
+    logits = logits - logits.max(axis=1, keepdims=True)
+    probs = np.exp(logits)
+    probs /= probs.sum(axis=1, keepdims=True)
+
+    return [
+        {"label": _labels[index], "score": float(row[index])}
+        for row, index in zip(probs, probs.argmax(axis=1))
+    ]
+
+
+class LocalClassifier(ClassifierBackend):
+    """
+    프로세스 내부 혐오 표현 감지 (KcELECTRA 호환 ONNX 모델)
+
+    - 추론은 spawn 방식 프로세스 풀에서 실행되어 이벤트 루프와 GIL 을 점유하지 않음
+    - 배치는 앞단의 ClassifyBatcher 가 모아서 전달 (동시 배치 수는 classify_max_in_flight)
+    - onnxruntime / tokenizers / numpy 는 이 백엔드를 사용할 때만 필요
+    """
+
+    def __init__(
+        self,
+        model_path: Optional[str] = settings.classifier_model_path,
+        tokenizer_path: Optional[str] = settings.classifier_tokenizer_path,
+        labels: List[str] = settings.classifier_labels,
+        max_length: int = settings.classifier_max_length,
+        workers: int = settings.classifier_local_workers,
+        threads_per_worker: int = settings.classifier_local_threads,
+    ):
+        self.model_path = model_path
+        self.tokenizer_path = tokenizer_path
+        self.labels = list(labels)
+        self.max_length = max_length
+        self.workers = workers
+        self.threads_per_worker = threads_per_worker
+        self._pool: Optional[ProcessPoolExecutor] = None
+
+    @property
+    def model_version(self) -> str:
+        # 같은 경로의 모델 파일이 교체된 경우도 구분 (크기/수정 시각)
+        try:
+            stat = os.stat(self.model_path)
+            file_id = (stat.st_size, stat.st_mtime_ns)
+        except (OSError, TypeError):
+            file_id = None
+        return model_version_tag("local", self.model_path, file_id, self.labels, self.max_length)
+
+    async def start(self):
+        """프로세스 풀 생성 및 모델 로드 확인"""
+        if self._pool is not None:
+            return
+        if not self.model_path or not self.tokenizer_path:
+            raise RuntimeError("CLASSIFIER_MODEL_PATH and CLASSIFIER_TOKENIZER_PATH are required for the local classifier")
+        try:
+            import numpy  # noqa: F401
+            import onnxruntime  # noqa: F401
+            import tokenizers  # noqa: F401
+        except ImportError as e:
+            raise RuntimeError(f"Local classifier requires onnxruntime, tokenizers and numpy: {e}") from e
+
+        self._pool = ProcessPoolExecutor(
+            max_workers=self.workers,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=_init_worker,
+            initargs=(self.model_path, self.tokenizer_path, self.labels, self.max_length, self.threads_per_worker),
+        )
+        # 첫 메시지가 모델 로드를 기다리지 않도록 미리 워커를 띄움
+        await asyncio.gather(*(self.classify(["warm up"]) for _ in range(self.workers)))
+        logger.info("Local classifier loaded %s with %d workers", self.model_path, self.workers)
+
+    async def close(self):
+        if self._pool is not None:
+            self._pool.shutdown(wait=True, cancel_futures=True)
+            self._pool = None
+
+    async def classify(self, texts: List[str]) -> List[Dict[str, object]]:
+        if self._pool is None:
+            raise RuntimeError("Local classifier is not started")
+        return await asyncio.get_running_loop().run_in_executor(self._pool, _predict, texts)
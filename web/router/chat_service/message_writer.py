@@ -0,0 +1,217 @@
+import asyncio
+import json
+import logging
+import os
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Dict, List, Optional
+
+from config.models import HateSpeechLog, Message
+from config.settings import settings
+
+from .chat_store import ChatStore
+
+logger = logging.getLogger(__name__)
+
+MESSAGE = "message"
+HATE_SPEECH_LOG = "hate_speech_log"
+
+MODELS = {MESSAGE: Message, HATE_SPEECH_LOG: HateSpeechLog}
+
+
+@dataclass
+class PendingMessage:
+    """저장 대기 중인 메시지 (id 는 미리 할당되어 브로드캐스트에 사용 가능)"""
+    id: int
+    timestamp: datetime
+
+
+class MessageWriter:
+    """
+    Message / HateSpeechLog write-behind 저장
+
+    - 행을 버퍼에 모아 flush_interval_ms 마다 또는 flush_rows 개가 쌓이면 대량 insert
+    - 메시지 / 로그 id 는 DB 시퀀스에서 블록 단위로 미리 할당 (재시도 시 이미 저장된 행을 id 로 구분)
+    - 버퍼는 도착 순서 그대로 저장되어 채팅방별 순서가 유지됨
+    - 배치는 한 트랜잭션으로 저장되어, 실패 시 배치 전체를 다시 시도해도 중복 저장되지 않음
+      (커밋 결과를 알 수 없는 실패 후 재시도하면 이미 저장된 행은 id 로 확인하여 건너뜀)
+    - DB 장애 시 재시도하며, 버퍼가 한도를 넘으면 파일로 내보낸 뒤 복구 시 다시 저장
+    """
+
+    def __init__(
+        self,
+        store: ChatStore,
+        flush_interval_ms: int = settings.message_flush_interval_ms,
+        flush_rows: int = settings.message_flush_rows,
+        id_block_size: int = settings.message_id_block_size,
+        buffer_limit: int = settings.message_buffer_limit,
+        spill_path: str = settings.message_spill_path,
+    ):
+        self.store = store
+        self.flush_interval_ms = flush_interval_ms
+        self.flush_rows = flush_rows
+        self.id_block_size = id_block_size
+        self.buffer_limit = buffer_limit
+        self.spill_path = spill_path
+
+        self._buffer: List[tuple] = []           # (종류, 행) 도착 순서
+        self._pending: Dict[int, dict] = {}      # 아직 저장되지 않은 메시지 id -> 행
+        self._ids: Dict[str, List[int]] = {MESSAGE: [], HATE_SPEECH_LOG: []}
+        self._last_ids: Dict[str, int] = {MESSAGE: 0, HATE_SPEECH_LOG: 0}
+        self._id_lock = asyncio.Lock()
+        self._flush_lock = asyncio.Lock()
+        self._wakeup = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+        self._failures = 0
+
+    def start(self):
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        """남은 행을 모두 저장 (실패 시 파일로 내보냄) 후 종료"""
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+        if not await self.flush():
+            self._spill(len(self._buffer))
+
+    async def add_message(self, content: str, user_id: int, room_id: int) -> PendingMessage:
+        """메시지를 버퍼에 추가하고 미리 할당된 id 반환"""
+        self.start()
+        message_id = await self._next_id()
+        timestamp = datetime.utcnow()
+        row = {
+            "id": message_id,
+            "content": content,
+            "user_id": user_id,
+            "chat_room_id": room_id,
+            "timestamp": timestamp,
+            "is_hate_speech": False,
+            "warning_count": 0,
+        }
+        self._pending[message_id] = row
+        self._append(MESSAGE, row)
+        return PendingMessage(id=message_id, timestamp=timestamp)
+
+    async def add_hate_speech_log(self, user_id: int, room_id: int, username: str, content: str, warning_count: int):
+        self.start()
+        self._append(HATE_SPEECH_LOG, {
+            "id": await self._next_id(HATE_SPEECH_LOG),
+            "user_id": user_id,
+            "chat_room_id": room_id,
+            "content": content,
+            "username": username,
+            "timestamp": datetime.utcnow(),
+            "warning_count": warning_count,
+        })
+
+    def has_pending(self, room_id: int) -> bool:
+        """아직 DB 에 저장되지 않은 채팅방 메시지가 있는지"""
+        return any(row["chat_room_id"] == room_id for row in self._pending.values())
+
+    async def mark_hate_speech(self, message_id: int):
+        """혐오 표현 표시 - 아직 버퍼에 있으면 행을 수정, 이미 저장되었으면 DB 업데이트"""
+        # 진행 중인 flush 가 끝난 뒤 확인
+        async with self._flush_lock:
+            row = self._pending.get(message_id)
+            if row is not None:
+                row["is_hate_speech"] = True
+                return
+        await self.store.mark_hate_speech(message_id)
+
+    async def flush(self) -> bool:
+        """버퍼의 행을 대량 insert - 성공 여부 반환"""
+        async with self._flush_lock:
+            try:
+                await self._replay_spill()
+                while self._buffer:
+                    batch = self._buffer[:self.flush_rows]
+                    await self._write(batch)
+                    del self._buffer[:len(batch)]
+                    for kind, row in batch:
+                        if kind == MESSAGE:
+                            self._pending.pop(row["id"], None)
+            except Exception as e:
+                self._failures += 1
+                logger.warning("Message flush failed (%d rows buffered): %s", len(self._buffer), e)
+                if len(self._buffer) > self.buffer_limit:
+                    self._spill(len(self._buffer) - self.buffer_limit)
+                return False
+            self._failures = 0
+            return True
+
+    async def _next_id(self, kind: str = MESSAGE) -> int:
+        async with self._id_lock:
+            if not self._ids[kind]:
+                ids = await self.store.reserve_ids(MODELS[kind], self.id_block_size, self._last_ids[kind])
+                self._ids[kind] = ids
+                self._last_ids[kind] = ids[-1]
+            return self._ids[kind].pop(0)
+
+    def _append(self, kind: str, row: dict):
+        self._buffer.append((kind, row))
+        if len(self._buffer) >= self.flush_rows:
+            self._wakeup.set()
+
+    async def _write(self, batch: List[tuple]):
+        # 종류가 바뀌는 지점마다 나누어 도착 순서대로 insert (배치 전체가 한 트랜잭션)
+        runs = []
+        start = 0
+        for i in range(1, len(batch) + 1):
+            if i == len(batch) or batch[i][0] != batch[start][0]:
+                runs.append((MODELS[batch[start][0]], [row for _, row in batch[start:i]]))
+                start = i
+        await self.store.insert_batch(runs)
+
+    async def _run(self):
+        while True:
+            # 실패가 이어지면 재시도 간격을 늘림 (최대 5초)
+            interval = self.flush_interval_ms / 1000 * (2 ** min(self._failures, 6))
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=min(interval, 5.0))
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+            if self._buffer or os.path.exists(self.spill_path):
+                await self.flush()
+
+    def _spill(self, count: int):
+        """오래된 행부터 count 개를 파일로 내보냄"""
+        if count <= 0:
+            return
+        spilled, self._buffer = self._buffer[:count], self._buffer[count:]
+        with open(self.spill_path, "a", encoding="utf-8") as f:
+            for kind, row in spilled:
+                f.write(json.dumps({"kind": kind, "row": row}, default=datetime.isoformat, ensure_ascii=False) + "\n")
+                if kind == MESSAGE:
+                    self._pending.pop(row["id"], None)
+        logger.error("Spilled %d unsaved rows to %s", len(spilled), self.spill_path)
+
+    async def _replay_spill(self):
+        """파일로 내보낸 행을 먼저 저장 (순서 유지)"""
+        if not os.path.exists(self.spill_path):
+            return
+        with open(self.spill_path, encoding="utf-8") as f:
+            entries = [json.loads(line) for line in f if line.strip()]
+        batch = []
+        for entry in entries:
+            row = entry["row"]
+            row["timestamp"] = datetime.fromisoformat(row["timestamp"])
+            batch.append((entry["kind"], row))
+        for i in range(0, len(batch), self.flush_rows):
+            await self._write(batch[i:i + self.flush_rows])
+            # 저장된 행은 파일에서 제거 (중간에 실패해도 다시 저장되지 않음)
+            self._rewrite_spill(entries[i + self.flush_rows:])
+        logger.info("Replayed %d spilled rows from %s", len(batch), self.spill_path)
+
+    def _rewrite_spill(self, entries: List[dict]):
+        if not entries:
+            os.remove(self.spill_path)
+            return
+        tmp_path = self.spill_path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            for entry in entries:
+                f.write(json.dumps(entry, default=datetime.isoformat, ensure_ascii=False) + "\n")
+        os.replace(tmp_path, self.spill_path)
@@ -0,0 +1,202 @@
+import asyncio
+import logging
+from dataclasses import dataclass
+from typing import Awaitable, Callable, Dict, List, Tuple
+
+from fastapi import WebSocket, status
+
+from cached.history_cache import HistoryCache
+from cached.redis_manager import RedisManager
+from config.settings import settings
+from security.principal import principal_cache
+from utils.connection_manager import ConnectManager
+
+from .chat_store import ChatStore
+from .message_writer import MessageWriter
+
+logger = logging.getLogger(__name__)
+
+HATE_LABEL = "혐오"
+
+# 채팅방 검열 모드
+MODERATION_BLOCKING = "blocking"      # 감지 완료 후 브로드캐스트 (기존 방식)
+MODERATION_OPTIMISTIC = "optimistic"  # 먼저 브로드캐스트 후 혐오 표현이면 회수
+MODERATION_MODES = (MODERATION_BLOCKING, MODERATION_OPTIMISTIC)
+
+
+@dataclass
+class ModerationJob:
+    """백그라운드 검열 대상 메시지"""
+    message_id: int
+    room_id: int
+    user_id: int
+    username: str
+    content: str
+    websocket: WebSocket
+
+
+class ModerationWorker:
+    """
+    혐오 표현 감지 및 경고/차단 처리
+
+    - blocking 모드: penalize 를 WebSocket 루프에서 직접 호출
+    - optimistic 모드: submit 으로 큐에 넣으면 워커가 감지 후
+      혐오 표현이면 회수(retract) 이벤트를 브로드캐스트하고 경고/차단 처리
+    - 같은 사용자의 작업은 항상 같은 워커 큐로 보내 순서대로 처리하고,
+      경고/차단 처리는 사용자별 lock 으로 직렬화 (여러 연결에서 동시에 감지된 경우)
+    """
+
+    def __init__(
+        self,
+        manager: ConnectManager,
+        redis_manager: RedisManager,
+        store: ChatStore,
+        writer: MessageWriter,
+        history: HistoryCache,
+        classify: Callable[[str], Awaitable[Dict[str, str]]],
+        workers: int = settings.moderation_workers,
+        max_queue_size: int = settings.moderation_queue_size,
+    ):
+        self.manager = manager
+        self.redis = redis_manager
+        self.store = store
+        self.writer = writer
+        self.history = history
+        self.classify = classify
+        self.workers = workers
+        self.max_queue_size = max_queue_size
+
+        self._queues: List[asyncio.Queue] = []
+        self._tasks: List[asyncio.Task] = []
+        self._user_locks: Dict[int, Tuple[asyncio.Lock, int]] = {}  # user_id -> (lock, 사용 중인 작업 수)
+
+    def start(self):
+        if self._tasks:
+            return
+        queue_size = max(1, self.max_queue_size // self.workers)
+        self._queues = [asyncio.Queue(maxsize=queue_size) for _ in range(self.workers)]
+        self._tasks = [asyncio.create_task(self._run(queue)) for queue in self._queues]
+
+    async def stop(self):
+        """큐에 남은 작업을 모두 처리한 뒤 워커 종료"""
+        if not self._tasks:
+            return
+        for queue in self._queues:
+            await queue.join()
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    async def submit(self, job: ModerationJob):
+        """검열 작업 등록 - 사용자별로 고정된 워커 큐 (큐가 가득 차면 대기)"""
+        self.start()
+        await self._queues[job.user_id % len(self._queues)].put(job)
+
+    async def is_hate_speech(self, content: str) -> bool:
+        verdict = await self.classify(content)
+        return verdict["label"] == HATE_LABEL
+
+    async def penalize(
+        self,
+        websocket: WebSocket,
+        user_id: int,
+        username: str,
+        room_id: int,
+        content: str,
+    ) -> bool:
+        """
+        혐오 표현 사용자 경고/차단 처리
+
+        Returns:
+            bool: 차단 여부 (차단 시 WebSocket 은 닫힌 상태)
+        """
+        lock, waiting = self._user_locks.get(user_id, (None, 0))
+        if lock is None:
+            lock = asyncio.Lock()
+        self._user_locks[user_id] = (lock, waiting + 1)
+        try:
+            async with lock:
+                return await self._penalize(websocket, user_id, username, room_id, content)
+        finally:
+            # 사용 중인 작업이 없으면 lock 제거
+            lock, waiting = self._user_locks[user_id]
+            if waiting <= 1:
+                del self._user_locks[user_id]
+            else:
+                self._user_locks[user_id] = (lock, waiting - 1)
+
+    async def _penalize(
+        self,
+        websocket: WebSocket,
+        user_id: int,
+        username: str,
+        room_id: int,
+        content: str,
+    ) -> bool:
+        # 경고 횟수 증가/차단 판정/해제 예약을 한 번에 처리
+        warning_count, is_banned = await self.redis.register_hate_speech(
+            user_id, settings.ban_max_warnings, settings.ban_seconds, settings.ban_seconds
+        )
+
+        # 🚨 혐오 표현 로그 저장 (write-behind) 및 경고 횟수/차단 여부 업데이트
+        await self.writer.add_hate_speech_log(user_id, room_id, username, content, warning_count)
+        await self.store.update_member_moderation(user_id, warning_count, is_banned)
+        principal_cache.invalidate_user(user_id)
+
+        if is_banned:
+            # 🚨 해당 사용자에게 차단 알림 (alert)
+            await self.manager.send_personal(websocket, {
+                "username": "System",
+                "content": "차단되었습니다. 더 이상 메시지를 보낼 수 없습니다.",
+                "alert": True,  # 클라이언트에서 alert 처리
+                "redirect": True
+            })
+
+            # ⚠️ 방 전체에 차단 알림 브로드캐스트
+            await self.manager.broadcast(
+                {"username": "System", "content": f"{username}님이 차단되었습니다.", "room_id": room_id},
+                room_id
+            )
+
+            await self.manager.close(websocket, code=status.WS_1008_POLICY_VIOLATION)
+            return True
+
+        # 🚨 사용자에게 개별적으로 경고 알림
+        await self.manager.send_personal(websocket, {
+            "username": "System",
+            "content": f"경고 {warning_count}/{settings.ban_max_warnings}: 혐오 표현이 감지되었습니다.",
+            "alert": True  # 클라이언트에서 alert 처리
+        })
+
+        # ⚠️ 방 전체에 시스템 메시지로 경고 알림
+        await self.manager.broadcast(
+            {"username": "System", "content": f"{username}님이 경고 {warning_count}/{settings.ban_max_warnings}을 받았습니다.", "room_id": room_id},
+            room_id
+        )
+        return False
+
+    async def _run(self, queue: asyncio.Queue):
+        while True:
+            job = await queue.get()
+            try:
+                await self._handle(job)
+            except Exception:
+                logger.exception("Moderation job failed for message %s", job.message_id)
+            finally:
+                queue.task_done()
+
+    async def _handle(self, job: ModerationJob):
+        if not await self.is_hate_speech(job.content):
+            return
+
+        # 이미 브로드캐스트된 메시지를 혐오 표현으로 표시하고 회수
+        await self.writer.mark_hate_speech(job.message_id)
+        await self.history.remove(job.room_id, job.message_id)
+
+        await self.manager.broadcast(
+            {"type": "retract", "message_id": job.message_id, "room_id": job.room_id},
+            job.room_id
+        )
+
+        await self.penalize(job.websocket, job.user_id, job.username, job.room_id, job.content)
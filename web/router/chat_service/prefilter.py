@@ -0,0 +1,334 @@
+import logging
+import os
+import re
+import time
+import unicodedata
+from collections import deque
+from typing import Dict, FrozenSet, Iterable, Iterator, List, Optional, Tuple
+
+from config.settings import settings
+
+from .moderation import HATE_LABEL
+
+logger = logging.getLogger(__name__)
+
+BENIGN_LABEL = "일반"
+
+# 한글 음절 -> 호환 자모 분해 테이블
+CHOSEONG = "ㄱㄲㄴㄷㄸㄹㅁㅂㅃㅅㅆㅇㅈㅉㅊㅋㅌㅍㅎ"
+JUNGSEONG = "ㅏㅐㅑㅒㅓㅔㅕㅖㅗㅘㅙㅚㅛㅜㅝㅞㅟㅠㅡㅢㅣ"
+JONGSEONG = ("", "ㄱ", "ㄲ", "ㄳ", "ㄴ", "ㄵ", "ㄶ", "ㄷ", "ㄹ", "ㄺ", "ㄻ", "ㄼ", "ㄽ", "ㄾ", "ㄿ", "ㅀ",
+             "ㅁ", "ㅂ", "ㅄ", "ㅅ", "ㅆ", "ㅇ", "ㅈ", "ㅊ", "ㅋ", "ㅌ", "ㅍ", "ㅎ")
+
+# 된소리는 예사소리로 통일 (씨발 -> 시발)
+FORTIS = str.maketrans("ㄲㄸㅃㅆㅉ", "ㄱㄷㅂㅅㅈ")
+
+# 웃음/울음 등 의미 없는 자모 (이것만 남은 메시지는 모델 검사 생략)
+FILLER_JAMO = set("ㅋㅎㅠㅜㄷㅇㅡ")
+
+# 사전 매칭 결과
+MATCH_WORD = "word"        # 단어 첫머리부터 일치 - 바로 혐오 표현
+MATCH_IN_WORD = "in_word"  # 단어 중간에서만 일치 - 모델로 확인
+
+URL_PATTERN = re.compile(r"(https?://|www\.)\S+", re.IGNORECASE)
+
+
+def _is_syllable(char: str) -> bool:
+    return "가" <= char <= "힣"
+
+
+def _is_jamo(char: str) -> bool:
+    return "ㄱ" <= char <= "ㆎ"
+
+
+def _normalize(text: str) -> str:
+    """NFKC + 소문자 (호환 자모는 NFKC 에서 조합형 자모로 바뀌므로 그대로 유지)"""
+    return "".join(char if _is_jamo(char) else unicodedata.normalize("NFKC", char).lower() for char in text)
+
+
+def _decompose_syllable(char: str) -> str:
+    index = ord(char) - ord("가")
+    return CHOSEONG[index // 588] + JUNGSEONG[index % 588 // 28] + JONGSEONG[index % 28]
+
+
+def tokenize(text: str) -> List[str]:
+    """
+    매칭 단위(단어) 분리 (NFKC, 소문자)
+
+    공백/숫자/기호로 나눈 조각 중 한 글자짜리가 이어지면 하나로 붙인다 ("시1발", "시 발" -> "시발").
+    두 글자 이상인 조각은 붙이지 않아 단어 경계를 넘는 매칭("다시 발표")은 생기지 않는다.
+    """
+    tokens: List[str] = []
+    single_run = False  # 마지막 토큰이 한 글자 조각들로만 이루어졌는지
+    fragment: List[str] = []
+    for char in _normalize(text) + " ":
+        if char.isalpha():
+            fragment.append(char)
+            continue
+        if not fragment:
+            continue
+        if len(fragment) == 1 and single_run:
+            tokens[-1] += fragment[0]
+        else:
+            tokens.append("".join(fragment))
+            single_run = len(fragment) == 1
+        fragment = []
+    return tokens
+
+
+def decompose(token: str) -> Tuple[str, str, FrozenSet[int]]:
+    """
+    단어 하나를 매칭용으로 정규화 (자모 분해, 된소리 통일)
+
+    Returns:
+        (음절을 자모로 분해한 문자열,
+         직접 입력된 자모 문자열 - 음절 위치는 구분자,
+         분해한 문자열에서 글자 경계 위치)
+    """
+    syllables: List[str] = []
+    jamo: List[str] = []
+    boundaries = {0}
+    length = 0
+    for char in token:
+        if _is_syllable(char):
+            decomposed = _decompose_syllable(char)
+            if jamo and jamo[-1] != "|":
+                jamo.append("|")
+        else:
+            decomposed = char
+            if _is_jamo(char):
+                jamo.append(char)
+            elif jamo and jamo[-1] != "|":
+                jamo.append("|")
+        syllables.append(decomposed)
+        length += len(decomposed)
+        boundaries.add(length)
+    return "".join(syllables).translate(FORTIS), "".join(jamo).translate(FORTIS), frozenset(boundaries)
+
+
+class AhoCorasick:
+    """다중 패턴 문자열 검색 (Aho-Corasick 오토마톤)"""
+
+    def __init__(self, patterns: Iterable[str]):
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._output: List[List[str]] = [[]]
+
+        for pattern in patterns:
+            if pattern:
+                self._add(pattern)
+        self._build()
+
+    def __len__(self) -> int:
+        return sum(len(output) for output in self._output)
+
+    def _add(self, pattern: str):
+        state = 0
+        for char in pattern:
+            next_state = self._goto[state].get(char)
+            if next_state is None:
+                next_state = len(self._goto)
+                self._goto[state][char] = next_state
+                self._goto.append({})
+                self._fail.append(0)
+                self._output.append([])
+            state = next_state
+        if pattern not in self._output[state]:
+            self._output[state].append(pattern)
+
+    def _build(self):
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for char, next_state in self._goto[state].items():
+                queue.append(next_state)
+                fail = self._fail[state]
+                while fail and char not in self._goto[fail]:
+                    fail = self._fail[fail]
+                self._fail[next_state] = self._goto[fail].get(char, 0)
+                self._output[next_state] += self._output[self._fail[next_state]]
+
+    def finditer(self, text: str) -> Iterator[Tuple[int, int, str]]:
+        """(시작, 끝, 패턴) 순서로 모든 매칭 반환"""
+        state = 0
+        for end, char in enumerate(text, 1):
+            while state and char not in self._goto[state]:
+                state = self._fail[state]
+            state = self._goto[state].get(char, 0)
+            for pattern in self._output[state]:
+                yield end - len(pattern), end, pattern
+
+
+class Lexicon:
+    """
+    혐오 표현 사전 파일
+
+    [block] 혐오 표현 (자음만으로 된 항목은 직접 입력한 자모에만 매칭, ^ 로 시작하면 단어 첫머리에만 매칭)
+    [allow] 혐오 표현을 포함하지만 정상인 단어 (예: 시발점)
+    [benign] 메시지 전체가 일치하면 모델 검사를 생략하는 정규식
+    """
+
+    def __init__(self, block: List[str], allow: List[str], benign: List[str]):
+        syllable_terms, jamo_terms = [], []
+        self.word_start = set()
+        for term in block:
+            word_start = term.startswith("^")
+            decomposed = "".join(decompose(token)[0] for token in tokenize(term))
+            if not decomposed:
+                continue
+            if all(_is_jamo(char) and char not in JUNGSEONG for char in decomposed):
+                jamo_terms.append(decomposed)
+            else:
+                syllable_terms.append(decomposed)
+            if word_start:
+                self.word_start.add(decomposed)
+
+        self.block = AhoCorasick(syllable_terms)
+        self.block_jamo = AhoCorasick(jamo_terms)
+        self.allow = AhoCorasick("".join(decompose(token)[0] for token in tokenize(term)) for term in allow)
+        self.benign = [re.compile(pattern) for pattern in benign]
+        self.size = len(syllable_terms) + len(jamo_terms)
+
+    @classmethod
+    def load(cls, path: str) -> "Lexicon":
+        sections: Dict[str, List[str]] = {"block": [], "allow": [], "benign": []}
+        section = "block"
+        with open(path, encoding="utf-8") as f:
+            for line in f:
+                line = line.strip()
+                if not line or line.startswith("#"):
+                    continue
+                if line.startswith("[") and line.endswith("]"):
+                    section = line[1:-1].strip()
+                    if section not in sections:
+                        raise ValueError(f"Unknown lexicon section: {line}")
+                    continue
+                sections[section].append(line)
+        return cls(sections["block"], sections["allow"], sections["benign"])
+
+
+class Prefilter:
+    """
+    모델 추론 전 단계 필터
+
+    - 단어 첫머리부터 사전 항목에 일치 (허용 단어에 포함된 매칭은 제외) -> 바로 혐오 표현
+    - 단어 중간에서만 일치 -> 의심 메시지로 보고 반드시 모델로 전달 (benign 생략 대상에서 제외)
+    - 이모지/URL/숫자/웃음 등만 있거나 benign 규칙에 일치 -> 모델 검사 생략
+    - 그 외 메시지는 모델로 전달 (None 반환)
+    매칭은 단어 안에서 글자 경계에 맞는 경우만 인정한다 ("다시 발표", "시방" 은 매칭 안 됨).
+    사전 파일은 수정 시각을 확인하여 reload_interval 마다 다시 읽는다.
+    """
+
+    def __init__(
+        self,
+        path: str = settings.prefilter_lexicon_path,
+        reload_interval: float = settings.prefilter_reload_interval,
+    ):
+        self.path = path
+        self.reload_interval = reload_interval
+        self.lexicon = Lexicon([], [], [])
+        self._mtime: Optional[float] = None
+        self._checked_at = 0.0
+
+        self.lexicon_hits = 0  # 사전으로 바로 혐오 표현 판정
+        self.suspicious = 0    # 단어 중간 매칭 (모델로 전달)
+        self.allowlisted = 0
+        self.benign = 0
+        self.ambiguous = 0
+        self.reloads = 0
+        self.reload_errors = 0
+        self.maybe_reload(force=True)
+
+    def maybe_reload(self, force: bool = False):
+        """사전 파일이 바뀌었으면 다시 컴파일하여 교체 (실패 시 기존 사전 유지)"""
+        now = time.monotonic()
+        if not force and now - self._checked_at < self.reload_interval:
+            return
+        self._checked_at = now
+        try:
+            mtime = os.stat(self.path).st_mtime
+            if mtime == self._mtime:
+                return
+            self._mtime = mtime  # 잘못된 파일은 다시 수정될 때까지 재시도하지 않음
+            self.lexicon = Lexicon.load(self.path)
+            self.reloads += 1
+            logger.info("Loaded hate speech lexicon %s (%d terms)", self.path, self.lexicon.size)
+        except (OSError, ValueError, re.error) as e:
+            self.reload_errors += 1
+            logger.warning("Failed to load hate speech lexicon %s: %s", self.path, e)
+
+    def check(self, text: str) -> Optional[Dict[str, object]]:
+        """감지 결과 ({label, score}) 또는 모델 검사가 필요하면 None"""
+        self.maybe_reload()
+        lexicon = self.lexicon
+
+        match = self._match(lexicon, tokenize(text))
+        if match == MATCH_WORD:
+            self.lexicon_hits += 1
+            return {"label": HATE_LABEL, "score": 1.0}
+        if match == MATCH_IN_WORD:
+            self.suspicious += 1
+            return None
+
+        if self._is_benign(lexicon, text):
+            self.benign += 1
+            return {"label": BENIGN_LABEL, "score": 1.0}
+
+        self.ambiguous += 1
+        return None
+
+    def _match(self, lexicon: Lexicon, tokens: List[str]) -> Optional[str]:
+        """단어 첫머리 매칭이 하나라도 있으면 MATCH_WORD, 단어 중간 매칭만 있으면 MATCH_IN_WORD"""
+        result = None
+        allowlisted = False
+        for token in tokens:
+            syllables, jamo, boundaries = decompose(token)
+            for start, _, _ in lexicon.block_jamo.finditer(jamo):
+                # 직접 입력한 자음이 해당 항목으로 시작할 때만 확신 (ㅋㅋㅅㅂ 등은 모델로)
+                if start == 0 or jamo[start - 1] == "|":
+                    return MATCH_WORD
+                result = MATCH_IN_WORD
+
+            hits = [
+                (start, end)
+                for start, end, term in lexicon.block.finditer(syllables)
+                if start in boundaries and end in boundaries and (start == 0 or term not in lexicon.word_start)
+            ]
+            if not hits:
+                continue
+            allowed = [(start, end) for start, end, _ in lexicon.allow.finditer(syllables) if start in boundaries]
+            for start, end in hits:
+                if any(a_start <= start and end <= a_end for a_start, a_end in allowed):
+                    allowlisted = True
+                    continue
+                if start == 0:
+                    return MATCH_WORD
+                result = MATCH_IN_WORD
+
+        if allowlisted and result is None:
+            self.allowlisted += 1
+        return result
+
+    @staticmethod
+    def _is_benign(lexicon: Lexicon, text: str) -> bool:
+        stripped = text.strip()
+        if any(pattern.fullmatch(stripped) for pattern in lexicon.benign):
+            return True
+        # URL 을 제외하고 의미 있는 글자(문자)가 없으면 생략
+        stripped = URL_PATTERN.sub("", stripped)
+        return not any(
+            unicodedata.category(char).startswith("L") and char not in FILLER_JAMO
+            for char in stripped
+        )
+
+    def stats(self) -> dict:
+        return {
+            "lexicon_size": self.lexicon.size,
+            "lexicon_hits": self.lexicon_hits,
+            "suspicious": self.suspicious,
+            "allowlisted": self.allowlisted,
+            "benign": self.benign,
+            "ambiguous": self.ambiguous,
+            "reloads": self.reloads,
+            "reload_errors": self.reload_errors,
+        }
@@ -1,8 +0,0 @@
-from passlib.context import CryptContext
-
-# 비밀번호 해싱을 위한 설정
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
-
-def hash_password(password: str) -> str:
-    """비밀번호 해싱"""
-    return pwd_context.hash(password)
@@ -1,10 +1,12 @@
 from fastapi import APIRouter, HTTPException, Depends, status
 from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
 
+from cached.rate_limiter import limit_register
 from config.database import get_db
 from config.models import Member
 
-from .hasing import hash_password  # 모듈화된 해싱 함수 가져오기
+from security.hashing import hash_password  # 공용 해싱 정책 / 스레드풀
 
 from dto.register_schemas import RegisterUser
 
@@ -14,13 +16,15 @@ register_router = APIRouter(
     responses={404: {"description": "Not found"}},
 )
 
-@register_router.post("/register", status_code=status.HTTP_201_CREATED)
-def register_user(user: RegisterUser, db: Session = Depends(get_db)):
+@register_router.post("/register", status_code=status.HTTP_201_CREATED, dependencies=[Depends(limit_register)])
+async def register_user(user: RegisterUser, db: Session = Depends(get_db)):
     """회원가입"""
     # 기존 사용자 체크
-    existing_user = db.query(Member).filter(
-        (Member.username == user.username) | (Member.email == user.email)
-    ).first()
+    existing_user = await run_in_threadpool(
+        lambda: db.query(Member).filter(
+            (Member.username == user.username) | (Member.email == user.email)
+        ).first()
+    )
     if existing_user:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
@@ -31,9 +35,13 @@ def register_user(user: RegisterUser, db: Session = Depends(get_db)):
     new_user = Member(
         username=user.username,
         email=user.email,
-        hashed_password=hash_password(user.password),
+        hashed_password=await hash_password(user.password),
     )
-    db.add(new_user)
-    db.commit()
-    db.refresh(new_user)
+
+    def save():
+        db.add(new_user)
+        db.commit()
+        db.refresh(new_user)
+
+    await run_in_threadpool(save)
     return {"message": "User registered successfully", "username": new_user.username}
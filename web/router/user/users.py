@@ -1,7 +1,10 @@
 from sqlalchemy.orm import Session
 
-from fastapi import Depends, HTTPException, status, APIRouter
+from typing import Optional
+
+from fastapi import Depends, HTTPException, status, APIRouter, Query, Response
 from fastapi.security import OAuth2PasswordRequestForm
+from starlette.concurrency import run_in_threadpool
 
 from dto.token_schemas import Token
 from dto.user_schemas import UserRead
@@ -11,17 +14,14 @@ from datetime import timedelta
 from security.auth import authenticate_user
 from security.jwt import create_access_token
 from security.auth import get_current_user
+from security.principal import Principal
 
 from config.settings import settings
 from config.database import get_db
 from config.models import Member
 
-from cached.redis_manager import RedisManager
-
-
-# Cached
-
-redis_manager = RedisManager()
+from cached.redis_manager import redis_manager
+from cached.rate_limiter import limit_login
 
 auth_router = APIRouter(
     prefix="/user",
@@ -29,33 +29,25 @@ auth_router = APIRouter(
     responses={404: {"description": "Not found"}},
 )
 
-#회원정보 조회
-
-# 회원정보 조회
-@auth_router.get("/all_users", response_model=list[UserRead])
-async def get_all_users(db: Session = Depends(get_db)):
+async def _read_user_status(users) -> list[UserRead]:
     """
-    모든 사용자 정보 반환
+    Redis 에서 경고 횟수 및 차단 상태를 한 번의 MGET 으로 조회
+    Redis 에 데이터가 없으면 DB 값을 사용하고 한 번의 파이프라인으로 Redis 에 동기화
     """
-    users = db.query(Member).all()
-
-    if not users:
-        raise HTTPException(status_code=404, detail="No users found")
+    status_by_user = await redis_manager.get_moderation_status_bulk([user.id for user in users])
 
     user_data = []
+    pipe = redis_manager.pipeline()
     for user in users:
-        # Redis에서 경고 횟수 및 차단 상태 조회
-        warning_count = redis_manager.get_hate_count(user.id)
-        is_banned = redis_manager.check_ban_status(user.id)
+        warning_count, is_banned = status_by_user[user.id]
 
-        # Redis에 데이터가 없으면 DB에서 가져와 Redis에 동기화
         if warning_count == 0:
             warning_count = user.warnings  or 0
-            redis_manager.client.set(f"user:{user.id}:hate_count", warning_count)
+            pipe.set(f"user:{user.id}:hate_count", warning_count)
 
         if not is_banned:
             is_banned = user.is_blocked or False
-            redis_manager.client.set(f"user:{user.id}:is_banned", "1" if is_banned else "0")
+            pipe.set(f"user:{user.id}:is_banned", "1" if is_banned else "0")
 
         user_data.append(
             UserRead(
@@ -66,18 +58,51 @@ async def get_all_users(db: Session = Depends(get_db)):
                 is_banned=is_banned
             )
         )
-
+    await pipe.execute()
     return user_data
 
 
+def _fetch_user_page(db: Session, limit: int, cursor: Optional[int]):
+    """id 기준 keyset 페이지 조회 (다음 페이지 확인을 위해 limit + 1 개)"""
+    query = db.query(Member.id, Member.username, Member.email, Member.warnings, Member.is_blocked)
+    if cursor is not None:
+        query = query.filter(Member.id > cursor)
+    return query.order_by(Member.id).limit(limit + 1).all()
+
+
+# 회원정보 조회
+@auth_router.get("/all_users", response_model=list[UserRead])
+async def get_all_users(
+    response: Response,
+    limit: int = Query(100, ge=1, le=1000),
+    cursor: Optional[int] = Query(None, description="이전 페이지의 X-Next-Cursor 값"),
+    db: Session = Depends(get_db)
+):
+    """
+    사용자 정보 페이지 조회 (id 순)
+
+    다음 페이지가 있으면 X-Next-Cursor 헤더로 커서를 반환
+    """
+    users = await run_in_threadpool(_fetch_user_page, db, limit, cursor)
+
+    if not users and cursor is None:
+        raise HTTPException(status_code=404, detail="No users found")
+
+    if len(users) > limit:
+        users = users[:limit]
+        response.headers["X-Next-Cursor"] = str(users[-1].id)
+
+    return await _read_user_status(users)
+
+
 # 로그인
 
-@auth_router.post("/login", response_model=Token)
-def login_for_access_token(form_data: OAuth2PasswordRequestForm = Depends(), db: Session = Depends(get_db)):
+@auth_router.post("/login", response_model=Token, dependencies=[Depends(limit_login)])
+async def login_for_access_token(form_data: OAuth2PasswordRequestForm = Depends(), db: Session = Depends(get_db)):
     """
     사용자 로그인 및 JWT 토큰 발급
     """
-    user = authenticate_user(db, form_data.username, form_data.password)
+    user = await authenticate_user(db, form_data.username, form_data.password)
     if not user:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
@@ -86,7 +111,7 @@ def login_for_access_token(form_data: OAuth2PasswordRequestForm = Depends(), db:
         )
 
     # 차단 여부 확인
-    is_banned = redis_manager.check_ban_status(user.id)
+    is_banned = await redis_manager.check_ban_status(user.id)
 
     access_token_expires = timedelta(minutes=settings.access_token_expire_minutes)
     access_token = create_access_token(
@@ -103,29 +128,11 @@ def login_for_access_token(form_data: OAuth2PasswordRequestForm = Depends(), db:
 # 회원 조회
 
 @auth_router.get("/my_account", response_model=UserRead)
-def read_users_me(current_user: Member = Depends(get_current_user), db: Session = Depends(get_db)):
+async def read_users_me(current_user: Principal = Depends(get_current_user)):
     """
     현재 로그인한 사용자 정보 반환
     """
-    # Redis에서 경고 횟수 및 차단 상태 조회
-    warning_count = redis_manager.get_hate_count(current_user.id)
-    is_banned = redis_manager.check_ban_status(current_user.id)
-
-    # Redis에 데이터가 없으면 DB에서 가져와 Redis에 동기화
-    if warning_count == 0:
-        warning_count = current_user.warnings  or 0
-        redis_manager.client.set(f"user:{current_user.id}:hate_count", warning_count)
-
-    if not is_banned:
-        is_banned = current_user.is_blocked or False
-        redis_manager.client.set(f"user:{current_user.id}:is_banned", "1" if is_banned else "0")
-
-    return UserRead(
-        id=current_user.id,
-        username=current_user.username,
-        email=current_user.email,
-        warning_count=warning_count,
-        is_banned=is_banned
-    )
+    user_data = await _read_user_status([current_user])
+    return user_data[0]
 
 
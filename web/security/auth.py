@@ -1,31 +1,55 @@
-from typing import Optional
+from typing import Awaitable, Callable, Optional
 from sqlalchemy.orm import Session
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
-from passlib.context import CryptContext
+from starlette.concurrency import run_in_threadpool
 
+from security.hashing import password_hasher
 from security.jwt import decode_access_token
 from config.database import get_db
 from config.models import Member
-from dto.token_schemas import TokenData
+from router.chat_service.chat_store import get_member_by_username
+from security.principal import Principal, principal_cache
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/user/login")
 
-def verify_password(plain_password: str, hashed_password: str) -> bool:
-    """비밀번호 검증"""
-    return pwd_context.verify(plain_password, hashed_password)
-
-def authenticate_user(db: Session, username: str, password: str) -> Optional[Member]:
-    """사용자 인증"""
-    user = db.query(Member).filter(Member.username == username).first()
+async def authenticate_user(db: Session, username: str, password: str) -> Optional[Member]:
+    """
+    사용자 인증 (해시 검증은 해싱 전용 스레드풀에서 실행)
+    해싱 정책(cost)이 바뀐 경우 새 해시로 교체
+    """
+    user = await run_in_threadpool(get_member_by_username, db, username)
     if not user:
         return None
-    if not verify_password(password, user.hashed_password):
+    valid, new_hash = await password_hasher.verify_and_update(password, user.hashed_password)
+    if not valid:
         return None
+    if new_hash is not None:
+        user.hashed_password = new_hash
+        await run_in_threadpool(db.commit)
     return user
 
-def get_current_user(token: str = Depends(oauth2_scheme), db: Session = Depends(get_db)) -> Member:
+async def resolve_principal(
+    payload: dict, load_member: Callable[[str], Awaitable[Optional[Member]]]
+) -> Optional[Principal]:
+    """
+    디코딩된 토큰의 사용자 조회 (캐시에 없을 때만 load_member 로 DB 조회)
+    """
+    principal = principal_cache.get(payload)
+    if principal is not None:
+        return principal
+
+    username = payload.get("sub")
+    if username is None:
+        return None
+    user = await load_member(username)
+    if user is None:
+        return None
+    principal = Principal.from_member(user)
+    principal_cache.set(payload, principal)
+    return principal
+
+async def get_current_user(token: str = Depends(oauth2_scheme), db: Session = Depends(get_db)) -> Principal:
     """현재 사용자 가져오기"""
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
@@ -35,11 +59,8 @@ def get_current_user(token: str = Depends(oauth2_scheme), db: Session = Depends(
     payload = decode_access_token(token)
     if payload is None:
         raise credentials_exception
-    username: str = payload.get("sub")
-    if username is None:
-        raise credentials_exception
-    token_data = TokenData(username=username)
-    user = db.query(Member).filter(Member.username == token_data.username).first()
+
+    user = await resolve_principal(payload, lambda username: run_in_threadpool(get_member_by_username, db, username))
     if user is None:
         raise credentials_exception
     return user
@@ -0,0 +1,92 @@
+import asyncio
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Optional, Tuple, TypeVar
+
+from fastapi import HTTPException, status
+from passlib.context import CryptContext
+from starlette.concurrency import run_in_threadpool
+
+from config.settings import settings
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+# 비밀번호 해싱 정책 (cost 가 바뀌면 로그인 시 새 cost 로 다시 해싱)
+pwd_context = CryptContext(
+    schemes=["bcrypt"],
+    deprecated="auto",
+    bcrypt__rounds=settings.password_bcrypt_rounds,
+)
+
+
+class PasswordHasher:
+    """
+    bcrypt 해싱/검증 전용 스레드풀 (bcrypt 는 해싱 중 GIL 을 놓음)
+
+    - 동시에 실행되는 해싱은 workers 개로 제한되어 이벤트 루프와 DB 스레드풀을 점유하지 않음
+    - 실행 중 + 대기 중 작업이 max_pending 개를 넘으면 바로 503 으로 거절
+    """
+
+    def __init__(
+        self,
+        context: CryptContext = pwd_context,
+        workers: int = settings.password_hash_workers,
+        max_pending: int = settings.password_hash_max_pending,
+    ):
+        self.context = context
+        self.workers = workers
+        self.max_pending = max_pending
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._pending = 0
+        self.rejected = 0
+
+    async def shutdown(self):
+        """진행 중인 해싱이 끝날 때까지 대기 (대기는 스레드풀에서 하여 이벤트 루프를 막지 않음)"""
+        if self._executor is not None:
+            executor, self._executor = self._executor, None
+            await run_in_threadpool(executor.shutdown, wait=True)
+
+    async def hash(self, password: str) -> str:
+        return await self._submit(self.context.hash, password)
+
+    async def verify(self, password: str, hashed_password: str) -> bool:
+        return await self._submit(self.context.verify, password, hashed_password)
+
+    async def verify_and_update(self, password: str, hashed_password: str) -> Tuple[bool, Optional[str]]:
+        """
+        비밀번호 검증 및 필요 시 재해싱
+
+        Returns:
+            (검증 결과, 새 해시) - 현재 정책과 같으면 새 해시는 None
+        """
+        return await self._submit(self.context.verify_and_update, password, hashed_password)
+
+    async def _submit(self, func: Callable[..., T], *args) -> T:
+        if self._pending >= self.max_pending:
+            self.rejected += 1
+            logger.warning("Password hashing pool is full (%d pending)", self._pending)
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail="Server is busy, please try again",
+                headers={"Retry-After": "1"},
+            )
+
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="password-hash")
+
+        self._pending += 1
+        try:
+            return await asyncio.get_running_loop().run_in_executor(self._executor, func, *args)
+        finally:
+            self._pending -= 1
+
+
+password_hasher = PasswordHasher()
+
+
+async def hash_password(password: str) -> str:
+    """비밀번호 해싱"""
+    return await password_hasher.hash(password)
+
@@ -0,0 +1,92 @@
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Dict, Optional, Set
+
+from config.models import Member
+from config.settings import settings
+
+
+@dataclass(frozen=True)
+class Principal:
+    """인증된 사용자 정보 (요청 간 공유되는 읽기 전용 값, ORM 세션과 무관)"""
+    id: int
+    username: str
+    email: str
+    warnings: int = 0
+    is_blocked: bool = False
+
+    @classmethod
+    def from_member(cls, member: Member) -> "Principal":
+        return cls(
+            id=member.id,
+            username=member.username,
+            email=member.email,
+            warnings=member.warnings or 0,
+            is_blocked=member.is_blocked or False,
+        )
+
+
+class PrincipalCache:
+    """
+    토큰별 인증 사용자 캐시 (프로세스 내부 LRU)
+
+    - 키는 토큰의 jti (없으면 sub + exp)
+    - 항목 유지 시간은 ttl 과 토큰 만료 시각 중 짧은 쪽
+    - 사용자 정보가 바뀌면 (경고/차단/해제) invalidate_user 로 해당 사용자 항목 모두 제거
+    """
+
+    def __init__(self, ttl: int = settings.principal_cache_ttl, max_size: int = settings.principal_cache_size):
+        self.ttl = ttl
+        self.max_size = max_size
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()
+        self._keys_by_user: Dict[int, Set[str]] = {}
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def make_key(payload: dict) -> str:
+        return payload.get("jti") or f"{payload.get('sub')}:{payload.get('exp')}"
+
+    def get(self, payload: dict) -> Optional[Principal]:
+        key = self.make_key(payload)
+        entry = self._entries.get(key)
+        if entry is not None:
+            expires_at, principal = entry
+            if expires_at > time.time():
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return principal
+            self._remove(key)
+        self.misses += 1
+        return None
+
+    def set(self, payload: dict, principal: Principal):
+        expires_at = time.time() + self.ttl
+        if payload.get("exp") is not None:
+            expires_at = min(expires_at, float(payload["exp"]))
+
+        key = self.make_key(payload)
+        self._entries[key] = (expires_at, principal)
+        self._entries.move_to_end(key)
+        self._keys_by_user.setdefault(principal.id, set()).add(key)
+        while len(self._entries) > self.max_size:
+            self._remove(next(iter(self._entries)))
+
+    def invalidate_user(self, user_id: int):
+        for key in self._keys_by_user.pop(user_id, ()):
+            self._entries.pop(key, None)
+
+    def _remove(self, key: str):
+        _, principal = self._entries.pop(key)
+        keys = self._keys_by_user.get(principal.id)
+        if keys is not None:
+            keys.discard(key)
+            if not keys:
+                del self._keys_by_user[principal.id]
+
+    def stats(self) -> dict:
+        return {"size": len(self._entries), "hits": self.hits, "misses": self.misses}
+
+
+principal_cache = PrincipalCache()
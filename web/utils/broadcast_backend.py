@@ -0,0 +1,221 @@
+# utils/broadcast_backend.py
+import asyncio
+import logging
+from typing import Awaitable, Callable, Dict, Optional
+
+import redis.asyncio as aioredis
+
+from cached.redis_manager import redis_manager
+from config.settings import settings
+from .frame_codec import dumps_json, loads_json
+
+logger = logging.getLogger(__name__)
+
+# 수신한 메시지를 현재 워커의 로컬 연결에 전달하는 콜백 (room_id, message)
+DeliverFn = Callable[[int, dict], Awaitable[None]]
+
+
+class BroadcastBackend:
+    """
+    채팅방 메시지 브로드캐스트 백엔드
+
+    채팅방 구독은 참조 카운트로 관리되며, 워커에 해당 방의 연결이
+    하나라도 있는 동안만 채널을 구독한다.
+    """
+
+    def __init__(self):
+        self._deliver: Optional[DeliverFn] = None
+        self._refcounts: Dict[int, int] = {}
+
+    async def start(self, deliver: DeliverFn):
+        self._deliver = deliver
+
+    async def stop(self):
+        pass
+
+    async def subscribe(self, room_id: int):
+        count = self._refcounts.get(room_id, 0)
+        self._refcounts[room_id] = count + 1
+        if count == 0:
+            await self._subscribe_channel(room_id)
+
+    async def unsubscribe(self, room_id: int):
+        count = self._refcounts.get(room_id, 0)
+        if count <= 1:
+            self._refcounts.pop(room_id, None)
+            if count == 1:
+                await self._unsubscribe_channel(room_id)
+        else:
+            self._refcounts[room_id] = count - 1
+
+    async def publish(self, room_id: int, message: dict):
+        raise NotImplementedError
+
+    async def _subscribe_channel(self, room_id: int):
+        pass
+
+    async def _unsubscribe_channel(self, room_id: int):
+        pass
+
+    async def _dispatch(self, room_id: int, message: dict):
+        try:
+            await self._deliver(room_id, message)
+        except Exception:
+            logger.exception("Local fan-out failed for room %s", room_id)
+
+
+class InProcessBackend(BroadcastBackend):
+    """단일 프로세스 브로드캐스트 (기존 동작)"""
+
+    async def publish(self, room_id: int, message: dict):
+        if room_id in self._refcounts:
+            await self._deliver(room_id, message)
+
+
+class RedisPubSubBackend(BroadcastBackend):
+    """Redis pub/sub 기반 멀티 워커/노드 브로드캐스트"""
+
+    def __init__(self, client: aioredis.Redis, channel_prefix: str = "chat:room:"):
+        super().__init__()
+        self.client = client
+        self.channel_prefix = channel_prefix
+        self._pubsub = None
+        self._reader: Optional[asyncio.Task] = None
+
+    def _channel(self, room_id: int) -> str:
+        return f"{self.channel_prefix}{room_id}"
+
+    async def start(self, deliver: DeliverFn):
+        await super().start(deliver)
+        self._pubsub = self.client.pubsub(ignore_subscribe_messages=True)
+        self._reader = asyncio.create_task(self._read_loop())
+
+    async def stop(self):
+        if self._reader is not None:
+            self._reader.cancel()
+            await asyncio.gather(self._reader, return_exceptions=True)
+            self._reader = None
+        if self._pubsub is not None:
+            await self._pubsub.aclose()
+            self._pubsub = None
+
+    async def publish(self, room_id: int, message: dict):
+        await self.client.publish(self._channel(room_id), dumps_json(message))
+
+    async def _subscribe_channel(self, room_id: int):
+        await self._pubsub.subscribe(self._channel(room_id))
+
+    async def _unsubscribe_channel(self, room_id: int):
+        await self._pubsub.unsubscribe(self._channel(room_id))
+
+    async def _read_loop(self):
+        while True:
+            if not self._pubsub.subscribed:
+                await asyncio.sleep(0.1)
+                continue
+            try:
+                message = await self._pubsub.get_message(timeout=1.0)
+            except aioredis.RedisError as e:
+                logger.warning("Redis pub/sub read failed: %s", e)
+                await asyncio.sleep(1.0)
+                continue
+            if message is None or message["type"] != "message":
+                continue
+
+            channel = message["channel"]
+            room_id = int(channel[len(self.channel_prefix):])
+            await self._dispatch(room_id, loads_json(message["data"]))
+
+
+class RedisStreamsBackend(BroadcastBackend):
+    """Redis Streams 기반 브로드캐스트 (채팅방별 스트림, maxlen 으로 길이 제한)"""
+
+    def __init__(
+        self,
+        client: aioredis.Redis,
+        stream_prefix: str = "chat:stream:",
+        maxlen: int = 1000,
+        block_ms: int = 1000,
+    ):
+        super().__init__()
+        self.client = client
+        self.stream_prefix = stream_prefix
+        self.maxlen = maxlen
+        self.block_ms = block_ms
+        self._last_ids: Dict[str, str] = {}
+        self._reader: Optional[asyncio.Task] = None
+
+    def _stream(self, room_id: int) -> str:
+        return f"{self.stream_prefix}{room_id}"
+
+    async def start(self, deliver: DeliverFn):
+        await super().start(deliver)
+        self._reader = asyncio.create_task(self._read_loop())
+
+    async def stop(self):
+        if self._reader is not None:
+            self._reader.cancel()
+            await asyncio.gather(self._reader, return_exceptions=True)
+            self._reader = None
+
+    async def publish(self, room_id: int, message: dict):
+        await self.client.xadd(
+            self._stream(room_id),
+            {"data": dumps_json(message)},
+            maxlen=self.maxlen,
+            approximate=True,
+        )
+
+    async def _subscribe_channel(self, room_id: int):
+        # 구독 시점 이후의 메시지만 전달
+        stream = self._stream(room_id)
+        try:
+            info = await self.client.xinfo_stream(stream)
+            last_id = info["last-generated-id"]
+        except aioredis.ResponseError:  # 아직 스트림이 없음
+            last_id = "0-0"
+        self._last_ids[stream] = last_id
+
+    async def _unsubscribe_channel(self, room_id: int):
+        self._last_ids.pop(self._stream(room_id), None)
+
+    async def _read_loop(self):
+        while True:
+            if not self._last_ids:
+                await asyncio.sleep(0.1)
+                continue
+            streams = dict(self._last_ids)
+            try:
+                response = await self.client.xread(streams, block=self.block_ms)
+            except aioredis.RedisError as e:
+                logger.warning("Redis stream read failed: %s", e)
+                await asyncio.sleep(1.0)
+                continue
+
+            for stream, entries in response or []:
+                if stream not in self._last_ids:
+                    continue  # 읽는 동안 구독 해제된 방
+                room_id = int(stream[len(self.stream_prefix):])
+                for entry_id, fields in entries:
+                    self._last_ids[stream] = entry_id
+                    await self._dispatch(room_id, loads_json(fields["data"]))
+
+
+def create_broadcast_backend(backend: str = settings.broadcast_backend) -> BroadcastBackend:
+    """
+    설정값에 따라 브로드캐스트 백엔드 생성 (memory / redis / redis_streams)
+
+    broadcast_redis_url 이 없으면 공유 Redis 커넥션 풀 사용
+    """
+    if backend == "memory":
+        return InProcessBackend()
+
+    if settings.broadcast_redis_url:
+        client = aioredis.from_url(settings.broadcast_redis_url, decode_responses=True)
+    else:
+        client = redis_manager.client
+    if backend == "redis":
+        return RedisPubSubBackend(client)
+    if backend == "redis_streams":
+        return RedisStreamsBackend(client, maxlen=settings.broadcast_stream_maxlen)
+    raise ValueError(f"Unknown broadcast backend: {backend}")
@@ -1,23 +1,164 @@
 # utils/connection_manager.py
-from typing import Dict, List
-from fastapi import WebSocket
+import asyncio
+import logging
+from typing import Dict, Optional, Set
+from fastapi import WebSocket, status
+
+from config.settings import settings
+from .broadcast_backend import BroadcastBackend, InProcessBackend
+from .frame_codec import ENCODING_JSON, encode_frame
+
+logger = logging.getLogger(__name__)
+
+# 송신 큐 초과 시 정책
+OVERFLOW_DROP_OLDEST = "drop_oldest"  # 가장 오래된 메시지 버림
+OVERFLOW_DISCONNECT = "disconnect"    # 느린 클라이언트 연결 종료
+
+
+class _Close:
+    """송신 큐에 남은 메시지를 보낸 뒤 연결을 닫기 위한 표시"""
+
+    def __init__(self, code: int):
+        self.code = code
+
+
+class ClientConnection:
+    """연결별 송신 큐와 이를 비우는 writer 태스크"""
+
+    def __init__(self, websocket: WebSocket, room_id: int, max_queue_size: int, encoding: str):
+        self.websocket = websocket
+        self.room_id = room_id
+        self.encoding = encoding  # json(텍스트) / msgpack(바이너리)
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=max_queue_size)
+        self.closing = False
+        self.dropped = 0
+        self.writer: Optional[asyncio.Task] = None
+
 
 class ConnectManager:
-    def __init__(self):
-        self.active_connections: Dict[int, List[WebSocket]] = {}  # room_id를 키로 사용
-
-    async def connect(self, websocket: WebSocket, room_id: int):
-        if room_id not in self.active_connections:
-            self.active_connections[room_id] = []
-        self.active_connections[room_id].append(websocket)
-
-    def disconnect(self, websocket: WebSocket, room_id: int):
-        if room_id in self.active_connections:
-            self.active_connections[room_id].remove(websocket)
-            if not self.active_connections[room_id]:
+    def __init__(
+        self,
+        backend: Optional[BroadcastBackend] = None,
+        max_queue_size: int = settings.send_queue_size,
+        overflow_policy: str = settings.send_overflow_policy,
+    ):
+        self.active_connections: Dict[int, Dict[WebSocket, ClientConnection]] = {}  # room_id를 키로 사용
+        self.backend = backend or InProcessBackend()
+        self.max_queue_size = max_queue_size
+        self.overflow_policy = overflow_policy
+        self._connections: Dict[WebSocket, ClientConnection] = {}
+        self._drops: Set[asyncio.Task] = set()  # 진행 중인 느린 클라이언트 연결 종료
+
+    async def start(self):
+        """브로드캐스트 백엔드 구독 시작 (워커당 하나의 구독 태스크)"""
+        await self.backend.start(self.send_local)
+
+    async def stop(self):
+        if self._drops:
+            await asyncio.gather(*self._drops, return_exceptions=True)
+        await self.backend.stop()
+
+    async def connect(self, websocket: WebSocket, room_id: int, encoding: str = ENCODING_JSON):
+        connection = ClientConnection(websocket, room_id, self.max_queue_size, encoding)
+        connection.writer = asyncio.create_task(self._write_loop(connection))
+
+        self.active_connections.setdefault(room_id, {})[websocket] = connection
+        self._connections[websocket] = connection
+        await self.backend.subscribe(room_id)
+
+    async def disconnect(self, websocket: WebSocket, room_id: int):
+        connection = self._connections.pop(websocket, None)
+        if connection is None:
+            return
+
+        room = self.active_connections.get(room_id)
+        if room is not None:
+            room.pop(websocket, None)
+            if not room:
                 del self.active_connections[room_id]
+        await self.backend.unsubscribe(room_id)
+
+        # 종료 요청된 연결은 남은 메시지를 보낸 뒤 writer 가 스스로 끝남
+        if not connection.closing and connection.writer is not asyncio.current_task():
+            connection.writer.cancel()
 
     async def broadcast(self, message: dict, room_id: int):
-        if room_id in self.active_connections:
-            for connection in self.active_connections[room_id]:
-                await connection.send_json(message)
+        """백엔드를 통해 모든 워커의 해당 채팅방 연결에 전달"""
+        await self.backend.publish(room_id, message)
+
+    async def send_local(self, room_id: int, message: dict):
+        """현재 워커에 연결된 채팅방 사용자 송신 큐에 추가 (인코딩별로 직렬화는 한 번만)"""
+        room = self.active_connections.get(room_id)
+        if not room:
+            return
+        frames = {}
+        for connection in list(room.values()):
+            frame = frames.get(connection.encoding)
+            if frame is None:
+                frame = frames[connection.encoding] = encode_frame(message, connection.encoding)
+            self._enqueue(connection, frame)
+
+    async def send_personal(self, websocket: WebSocket, message: dict):
+        """특정 사용자에게만 전달 (브로드캐스트와 같은 송신 큐 사용)"""
+        connection = self._connections.get(websocket)
+        if connection is not None:  # 이미 끊어진 연결은 무시
+            self._enqueue(connection, encode_frame(message, connection.encoding))
+
+    async def close(self, websocket: WebSocket, code: int = status.WS_1000_NORMAL_CLOSURE):
+        """송신 큐에 남은 메시지를 모두 보낸 뒤 연결 종료"""
+        connection = self._connections.get(websocket)
+        if connection is None:
+            await websocket.close(code=code)
+            return
+        connection.closing = True
+        self._enqueue(connection, _Close(code), force=True)
+
+    def _enqueue(self, connection: ClientConnection, frame, force: bool = False):
+        if connection.closing and not force:
+            return
+
+        if connection.queue.full():
+            if self.overflow_policy == OVERFLOW_DISCONNECT and not force:
+                # 느린 클라이언트 연결 종료
+                logger.warning("Send queue overflow, disconnecting slow consumer in room %s", connection.room_id)
+                connection.closing = True
+                connection.writer.cancel()
+                task = asyncio.create_task(self._drop_connection(connection, status.WS_1013_TRY_AGAIN_LATER))
+                self._drops.add(task)
+                task.add_done_callback(self._drop_done)
+                return
+            connection.queue.get_nowait()
+            connection.dropped += 1
+
+        connection.queue.put_nowait(frame)
+
+    async def _write_loop(self, connection: ClientConnection):
+        websocket = connection.websocket
+        try:
+            while True:
+                frame = await connection.queue.get()
+                if isinstance(frame, _Close):
+                    await websocket.close(code=frame.code)
+                    return
+                if isinstance(frame, bytes):
+                    await websocket.send_bytes(frame)
+                else:
+                    await websocket.send_text(frame)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            # 끊어진 소켓은 자동으로 제거
+            logger.info("Removing dead connection in room %s: %s", connection.room_id, e)
+            await self.disconnect(websocket, connection.room_id)
+
+    def _drop_done(self, task: asyncio.Task):
+        self._drops.discard(task)
+        if not task.cancelled() and task.exception() is not None:
+            logger.error("Failed to drop slow consumer", exc_info=task.exception())
+
+    async def _drop_connection(self, connection: ClientConnection, code: int):
+        await self.disconnect(connection.websocket, connection.room_id)
+        try:
+            await connection.websocket.close(code=code)
+        except Exception:
+            pass
@@ -0,0 +1,63 @@
+# utils/frame_codec.py
+import json
+from typing import Union
+
+from fastapi import WebSocket
+
+try:
+    import orjson
+except ImportError:  # orjson 미설치 시 표준 json 사용
+    orjson = None
+
+try:
+    import msgpack
+except ImportError:  # msgpack 미설치 시 바이너리 모드 비활성화
+    msgpack = None
+
+ENCODING_JSON = "json"
+ENCODING_MSGPACK = "msgpack"
+
+Frame = Union[str, bytes]
+
+
+def dumps_json(message: dict) -> str:
+    """JSON 직렬화 (orjson 이 있으면 사용)"""
+    if orjson is not None:
+        return orjson.dumps(message).decode("utf-8")
+    return json.dumps(message, separators=(",", ":"), ensure_ascii=False)
+
+
+def loads_json(data: Union[str, bytes]) -> dict:
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def encode_frame(message: dict, encoding: str) -> Frame:
+    """전송 프레임 생성 - json 은 텍스트, msgpack 은 바이너리 프레임"""
+    if encoding == ENCODING_MSGPACK:
+        return msgpack.packb(message, use_bin_type=True)
+    return dumps_json(message)
+
+
+def negotiate_encoding(websocket: WebSocket) -> str:
+    """클라이언트가 요청한 서브프로토콜 중 지원 가능한 프레임 인코딩 선택"""
+    requested = websocket.scope.get("subprotocols") or []
+    if ENCODING_MSGPACK in requested and msgpack is not None:
+        return ENCODING_MSGPACK
+    return ENCODING_JSON
+
+
+async def accept(websocket: WebSocket) -> str:
+    """인코딩 협상 후 연결 수락"""
+    encoding = negotiate_encoding(websocket)
+    requested = websocket.scope.get("subprotocols") or []
+    await websocket.accept(subprotocol=encoding if encoding in requested else None)
+    return encoding
+
+
+async def receive_message(websocket: WebSocket, encoding: str) -> dict:
+    """협상된 인코딩으로 수신 메시지 디코딩"""
+    if encoding == ENCODING_MSGPACK:
+        return msgpack.unpackb(await websocket.receive_bytes(), raw=False)
+    return loads_json(await websocket.receive_text())
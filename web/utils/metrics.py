@@ -0,0 +1,155 @@
+# utils/metrics.py
+import asyncio
+import time
+from typing import Optional
+
+from prometheus_client import CONTENT_TYPE_LATEST, REGISTRY, Counter, Histogram, generate_latest
+from prometheus_client.core import CounterMetricFamily, GaugeMetricFamily
+
+from config.settings import settings
+
+# 지연 시간 버킷 (초) - 1ms ~ 10s
+LATENCY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+# 메시지 처리 단계별 지연 시간 (수신 -> 큐 대기 -> 감지 -> 저장 -> 브로드캐스트, total 은 수신부터 브로드캐스트까지)
+MESSAGE_STAGE_SECONDS = Histogram(
+    "chat_message_stage_seconds",
+    "Latency of each stage of handling an incoming chat message",
+    ["stage"],
+    buckets=LATENCY_BUCKETS,
+)
+
+# 혐오 표현 감지 결과 (source: prefilter / cache / model, label: 모델 라벨)
+MODERATION_VERDICTS = Counter(
+    "chat_moderation_verdicts_total",
+    "Hate speech classification verdicts",
+    ["source", "label"],
+)
+
+# 전송 제한으로 지연/거절된 요청 (scope: connection / user_room / login / register)
+RATE_LIMITED = Counter(
+    "rate_limited_total",
+    "Requests delayed or rejected by rate limiting",
+    ["scope", "action"],
+)
+
+# 연결별 수신 큐가 가득 차서 버린 메시지
+INBOUND_REJECTED = Counter(
+    "chat_inbound_rejected_total",
+    "Messages rejected because the connection inbound queue was full",
+)
+
+CLASSIFY_BATCH_SIZE = Histogram(
+    "chat_classify_batch_size",
+    "Number of texts sent to the classifier backend per batch",
+    buckets=(1, 2, 4, 8, 16, 32, 64, 128),
+)
+
+CLASSIFY_QUEUE_WAIT_SECONDS = Histogram(
+    "chat_classify_queue_wait_seconds",
+    "Time a classification request waits in the batcher queue",
+    buckets=LATENCY_BUCKETS,
+)
+
+REDIS_COMMAND_SECONDS = Histogram(
+    "redis_command_seconds",
+    "Redis round trip latency (pipelines are one round trip)",
+    ["command"],
+    buckets=LATENCY_BUCKETS,
+)
+
+DB_STATEMENT_SECONDS = Histogram(
+    "db_statement_seconds",
+    "Database statement latency",
+    ["engine", "statement"],
+    buckets=LATENCY_BUCKETS,
+)
+
+EVENT_LOOP_LAG_SECONDS = Histogram(
+    "event_loop_lag_seconds",
+    "How late the event loop woke up a sleeping task",
+    buckets=LATENCY_BUCKETS,
+)
+
+
+class ConnectionCollector:
+    """스크랩 시점에 채팅방별 연결 수 / 송신 큐 길이 수집 (메시지 처리 경로에는 비용 없음)"""
+
+    def __init__(self, manager):
+        self.manager = manager
+
+    def collect(self):
+        connections = GaugeMetricFamily("chat_room_connections", "Open WebSocket connections per room", labels=["room_id"])
+        queue_depth = GaugeMetricFamily("chat_send_queue_depth", "Queued outgoing frames per room", labels=["room_id"])
+        queue_max = GaugeMetricFamily("chat_send_queue_depth_max", "Deepest send queue in the room", labels=["room_id"])
+        dropped = CounterMetricFamily("chat_send_dropped", "Frames dropped by full send queues", labels=["room_id"])
+
+        for room_id, room in list(self.manager.active_connections.items()):
+            depths = [connection.queue.qsize() for connection in room.values()]
+            label = [str(room_id)]
+            connections.add_metric(label, len(depths))
+            queue_depth.add_metric(label, sum(depths))
+            queue_max.add_metric(label, max(depths, default=0))
+            dropped.add_metric(label, sum(connection.dropped for connection in room.values()))
+
+        yield connections
+        yield queue_depth
+        yield queue_max
+        yield dropped
+
+
+def register_connection_manager(manager):
+    REGISTRY.register(ConnectionCollector(manager))
+
+
+def instrument_engine(engine, name: str):
+    """SQLAlchemy 엔진의 문장 실행 시간 기록"""
+    from sqlalchemy import event
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def _before(conn, cursor, statement, parameters, context, executemany):
+        context._metrics_started = time.perf_counter()
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def _after(conn, cursor, statement, parameters, context, executemany):
+        started = getattr(context, "_metrics_started", None)
+        if started is not None:
+            verb = statement.lstrip().split(None, 1)[0].upper() if statement.strip() else "UNKNOWN"
+            DB_STATEMENT_SECONDS.labels(name, verb).observe(time.perf_counter() - started)
+
+
+class LoopLagMonitor:
+    """interval 마다 잠들었다가 예정보다 늦게 깨어난 시간을 기록"""
+
+    def __init__(self, interval: float = settings.metrics_loop_lag_interval):
+        self.interval = interval
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self):
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            expected = loop.time() + self.interval
+            await asyncio.sleep(self.interval)
+            EVENT_LOOP_LAG_SECONDS.observe(max(0.0, loop.time() - expected))
+
+
+loop_lag_monitor = LoopLagMonitor()
+
+
+def render_latest():
+    """Prometheus 텍스트 형식 (본문, content type)"""
+    return generate_latest(REGISTRY), CONTENT_TYPE_LATEST